@@ -0,0 +1,57 @@
+"""add leaderboard table
+
+Revision ID: 034b743cee63
+Revises: 970024de59c9
+Create Date: 2026-10-18 12:02:19.945083
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '034b743cee63'
+down_revision: Union[str, None] = '970024de59c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LOWER_IS_BETTER = ('MSE', 'MAE', 'MAPE')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'leaderboard',
+        sa.Column('task_id', sa.Integer, sa.ForeignKey('task.id'), primary_key=True),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('answer_id', sa.Integer, sa.ForeignKey('answer.id'), nullable=False),
+        sa.Column('score', sa.Float, nullable=False),
+        sa.Column('rank_score', sa.Float, nullable=False),
+        sa.Column('updated_at', sa.DateTime)
+    )
+    op.create_index(
+        'ix_leaderboard_task_rank',
+        'leaderboard',
+        ['task_id', 'rank_score', 'answer_id']
+    )
+    op.get_bind().execute(
+        sa.text(
+            'INSERT INTO leaderboard (task_id, user_id, answer_id, score, rank_score, updated_at) '
+            'SELECT DISTINCT ON (answer.task_id, answer.user_id) '
+            'answer.task_id, answer.user_id, answer.id, answer.score, '
+            'CASE WHEN function.name IN :lower_is_better THEN -answer.score ELSE answer.score END AS rank_score, '
+            'now() FROM answer '
+            'JOIN task ON task.id = answer.task_id '
+            'JOIN function ON function.id = task.function_id '
+            'WHERE answer.score IS NOT NULL AND answer.is_active = TRUE '
+            'ORDER BY answer.task_id, answer.user_id, rank_score DESC, answer.id'
+        ).bindparams(sa.bindparam('lower_is_better', expanding=True)),
+        {'lower_is_better': LOWER_IS_BETTER}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leaderboard_task_rank', table_name='leaderboard')
+    op.drop_table('leaderboard')
@@ -0,0 +1,39 @@
+"""add id to scored answer index
+
+Revision ID: 0f576ae29e04
+Revises: c98436fd8a30
+Create Date: 2026-10-18 12:28:35.682427
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f576ae29e04'
+down_revision: Union[str, None] = 'c98436fd8a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SCORED_ANSWER = 'score IS NOT NULL AND is_active IS TRUE'
+
+
+def recreate_scored_index(columns) -> None:
+    op.drop_index('ix_answer_task_user_scored', table_name='answer')
+    op.create_index(
+        'ix_answer_task_user_scored',
+        'answer',
+        columns,
+        postgresql_where=sa.text(SCORED_ANSWER)
+    )
+
+
+def upgrade() -> None:
+    recreate_scored_index(['task_id', 'user_id', 'added_at', 'id'])
+
+
+def downgrade() -> None:
+    recreate_scored_index(['task_id', 'user_id', 'added_at'])
@@ -0,0 +1,38 @@
+"""add answer hot query indexes
+
+Revision ID: 10734d34d174
+Revises: 68ec47054de1
+Create Date: 2026-10-18 12:18:14.642564
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '10734d34d174'
+down_revision: Union[str, None] = '68ec47054de1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SCORED_ANSWER = 'score IS NOT NULL AND is_active IS TRUE'
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_answer_task_user_scored',
+        'answer',
+        ['task_id', 'user_id', 'added_at'],
+        postgresql_where=sa.text(SCORED_ANSWER)
+    )
+    op.create_index('ix_answer_user_task_added_at', 'answer', ['user_id', 'task_id', 'added_at'])
+    op.drop_index('ix_answer_user_task', table_name='answer')
+
+
+def downgrade() -> None:
+    op.create_index('ix_answer_user_task', 'answer', ['user_id', 'task_id'])
+    op.drop_index('ix_answer_user_task_added_at', table_name='answer')
+    op.drop_index('ix_answer_task_user_scored', table_name='answer')
@@ -0,0 +1,26 @@
+"""index active answers by task
+
+Revision ID: 18cc9ed1af25
+Revises: 47746e3c9f38
+Create Date: 2026-10-18 13:10:42.791295
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '18cc9ed1af25'
+down_revision: Union[str, None] = '47746e3c9f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_answer_task_active', 'answer', ['task_id', 'id'], postgresql_where=sa.text('is_active IS TRUE'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_answer_task_active', table_name='answer')
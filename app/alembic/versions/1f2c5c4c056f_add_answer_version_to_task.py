@@ -0,0 +1,29 @@
+"""add answer version to task
+
+Revision ID: 1f2c5c4c056f
+Revises: 37e9f1c1e80b
+Create Date: 2026-10-18 11:57:51.263791
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f2c5c4c056f'
+down_revision: Union[str, None] = '37e9f1c1e80b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'task',
+        sa.Column('ans_version', sa.Integer, nullable=False, server_default='0')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('task', 'ans_version')
@@ -0,0 +1,26 @@
+"""add rescore job cursor
+
+Revision ID: 396544b62aee
+Revises: 0f576ae29e04
+Create Date: 2026-10-18 12:41:59.809796
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '396544b62aee'
+down_revision: Union[str, None] = '0f576ae29e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('rescore_job', sa.Column('last_answer_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('rescore_job', 'last_answer_id')
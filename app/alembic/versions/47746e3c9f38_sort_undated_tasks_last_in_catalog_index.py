@@ -0,0 +1,32 @@
+"""sort undated tasks last in catalog index
+
+Revision ID: 47746e3c9f38
+Revises: 396544b62aee
+Create Date: 2026-10-18 12:46:47.492522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '47746e3c9f38'
+down_revision: Union[str, None] = '396544b62aee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_task_catalog', table_name='task')
+    op.create_index(
+        'ix_task_catalog',
+        'task',
+        [sa.text('(is_active IS TRUE)'), sa.text("COALESCE(end_date, '-infinity'::timestamp)"), 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_catalog', table_name='task')
+    op.create_index('ix_task_catalog', 'task', [sa.text('(is_active IS TRUE)'), 'end_date', 'id'])
@@ -0,0 +1,55 @@
+"""add task search indexes
+
+Revision ID: 60dbb231544f
+Revises: df2258af288f
+Create Date: 2026-10-18 12:14:02.530757
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision: str = '60dbb231544f'
+down_revision: Union[str, None] = 'df2258af288f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TASK_SEARCH_DOCUMENT = (
+    "to_tsvector('simple', "
+    "coalesce(name, '') || ' ' || coalesce(short_description, '') || ' ' || coalesce(description, ''))"
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column(
+        'task',
+        sa.Column('search_vector', TSVECTOR, sa.Computed(TASK_SEARCH_DOCUMENT, persisted=True))
+    )
+    op.create_index('ix_task_search_vector', 'task', ['search_vector'], postgresql_using='gin')
+    op.create_index(
+        'ix_task_name_trgm',
+        'task',
+        ['name'],
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index('ix_task_tags', 'task', ['tags'], postgresql_using='gin')
+    op.create_index(
+        'ix_task_catalog',
+        'task',
+        [sa.text('(is_active IS TRUE)'), 'end_date', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_catalog', table_name='task')
+    op.drop_index('ix_task_tags', table_name='task')
+    op.drop_index('ix_task_name_trgm', table_name='task')
+    op.drop_index('ix_task_search_vector', table_name='task')
+    op.drop_column('task', 'search_vector')
@@ -0,0 +1,25 @@
+"""add answer user task index
+
+Revision ID: 68ec47054de1
+Revises: 60dbb231544f
+Create Date: 2026-10-18 12:16:41.999721
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '68ec47054de1'
+down_revision: Union[str, None] = '60dbb231544f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_answer_user_task', 'answer', ['user_id', 'task_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_answer_user_task', table_name='answer')
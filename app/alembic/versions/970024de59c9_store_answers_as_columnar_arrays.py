@@ -0,0 +1,111 @@
+"""store answers as columnar arrays
+
+Revision ID: 970024de59c9
+Revises: ae0d69db87d0
+Create Date: 2026-10-18 12:00:56.352061
+
+"""
+import logging
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '970024de59c9'
+down_revision: Union[str, None] = 'ae0d69db87d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ('task', 'answer')
+BATCH_SIZE = 500
+SHOWN_INVALID_ROWS = 50
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def pack(task_ans):
+    ids = np.fromiter((int(id) for id in task_ans.keys()), dtype='<i8', count=len(task_ans))
+    values = np.fromiter((float(result) for result in task_ans.values()), dtype='<f8', count=len(task_ans))
+    order = np.argsort(ids, kind='stable')
+    ids = ids[order]
+
+    if np.any(ids[1:] == ids[:-1]):
+        raise ValueError('duplicate ids')
+
+    return ids.tobytes() + values[order].tobytes()
+
+
+def unpack(data):
+    size = len(data) // 16
+    ids = np.frombuffer(data, dtype='<i8', count=size)
+    values = np.frombuffer(data, dtype='<f8', count=size, offset=size * 8)
+    return dict(zip(map(str, ids.tolist()), values.tolist()))
+
+
+def pack_or_none(invalid_rows: List[int]):
+    def function(row_id, task_ans):
+        try:
+            return pack(task_ans)
+        except (AttributeError, TypeError, ValueError, OverflowError):
+            invalid_rows.append(row_id)
+            return None
+
+    return function
+
+
+def convert(table, source, target, target_type, function):
+    connection = op.get_bind()
+    table_clause = sa.table(table, sa.column('id'), sa.column(source), sa.column(target, target_type))
+
+    op.add_column(table, sa.Column(target, target_type, nullable=True))
+
+    rows = connection.execute(
+        sa.text(f'SELECT id, {source} FROM {table} WHERE {source} IS NOT NULL').execution_options(stream_results=True)
+    )
+
+    while batch := rows.fetchmany(BATCH_SIZE):
+        connection.execute(
+            table_clause.update().where(table_clause.c.id == sa.bindparam('row_id')).values({target: sa.bindparam('data')}),
+            [{'row_id': id, 'data': function(id, data)} for id, data in batch]
+        )
+
+    op.drop_column(table, source)
+    op.alter_column(table, target, new_column_name=source)
+
+
+def format_rows(row_ids: List[int]) -> str:
+    shown = ', '.join(map(str, row_ids[:SHOWN_INVALID_ROWS]))
+    return shown if len(row_ids) <= SHOWN_INVALID_ROWS else f'{shown} and {len(row_ids) - SHOWN_INVALID_ROWS} more'
+
+
+def upgrade() -> None:
+    skip_invalid = context.get_x_argument(as_dictionary=True).get('skip_invalid_answers', '').lower() in ('1', 'true', 'yes')
+    invalid: Dict[str, List[int]] = {}
+
+    for table in TABLES:
+        invalid[table] = []
+        convert(table, 'task_ans', 'task_ans_data', sa.LargeBinary, pack_or_none(invalid[table]))
+
+    invalid = {table: row_ids for table, row_ids in invalid.items() if row_ids}
+
+    if not invalid:
+        return
+
+    report = '; '.join(f'{table} ids {format_rows(row_ids)}' for table, row_ids in invalid.items())
+
+    if not skip_invalid:
+        raise RuntimeError(
+            f'Answers with duplicate ids or with ids or results that are not numbers cannot be converted: {report}. '
+            'Fix these rows, or rerun with "alembic -x skip_invalid_answers=true upgrade head" to clear them.'
+        )
+
+    logger.warning('Cleared answers with duplicate ids or with ids or results that are not numbers: %s', report)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        convert(table, 'task_ans', 'task_ans_json', sa.JSON, lambda row_id, data: unpack(data))
@@ -0,0 +1,43 @@
+"""add score job table
+
+Revision ID: ae0d69db87d0
+Revises: 1f2c5c4c056f
+Create Date: 2026-10-18 11:58:28.330869
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ae0d69db87d0'
+down_revision: Union[str, None] = '1f2c5c4c056f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'score_job',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('answer_id', sa.Integer, sa.ForeignKey('answer.id'), nullable=False),
+        sa.Column('status', sa.String, nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('error', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('started_at', sa.DateTime, nullable=True),
+        sa.Column('finished_at', sa.DateTime, nullable=True)
+    )
+    op.create_index(
+        'ix_score_job_queue',
+        'score_job',
+        ['id'],
+        postgresql_where=sa.text("status IN ('pending', 'running')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_score_job_queue', table_name='score_job')
+    op.drop_table('score_job')
@@ -0,0 +1,46 @@
+"""add rescore job table
+
+Revision ID: c98436fd8a30
+Revises: 10734d34d174
+Create Date: 2026-10-18 12:23:21.875911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c98436fd8a30'
+down_revision: Union[str, None] = '10734d34d174'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'rescore_job',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('task_id', sa.Integer, sa.ForeignKey('task.id'), nullable=False),
+        sa.Column('status', sa.String, nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('total', sa.Integer, nullable=True),
+        sa.Column('processed', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('error', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('started_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=True),
+        sa.Column('finished_at', sa.DateTime, nullable=True)
+    )
+    op.create_index(
+        'ix_rescore_job_queue',
+        'rescore_job',
+        ['id'],
+        postgresql_where=sa.text("status IN ('pending', 'running')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rescore_job_queue', table_name='rescore_job')
+    op.drop_table('rescore_job')
@@ -0,0 +1,59 @@
+"""hash and expire blacklisted tokens
+
+Revision ID: df2258af288f
+Revises: 034b743cee63
+Create Date: 2026-10-18 12:12:38.491420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'df2258af288f'
+down_revision: Union[str, None] = '034b743cee63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Upper bound for rows written before expiry was stored: REFRESH_TOKEN_EXPIRE_MINUTES.
+REFRESH_TOKEN_LIFETIME_MINUTES = 60 * 24 * 7
+
+
+def upgrade() -> None:
+    op.add_column('token_blacklist', sa.Column('token_digest', sa.LargeBinary))
+    op.add_column('token_blacklist', sa.Column('expires_at', sa.DateTime))
+
+    connection = op.get_bind()
+    connection.execute(sa.text('DELETE FROM token_blacklist WHERE token IS NULL'))
+    connection.execute(
+        sa.text(
+            "UPDATE token_blacklist SET token_digest = sha256(convert_to(token, 'UTF8')), "
+            "expires_at = timezone('utc', now()) + make_interval(mins => :minutes)"
+        ),
+        {'minutes': REFRESH_TOKEN_LIFETIME_MINUTES}
+    )
+    connection.execute(
+        sa.text(
+            'DELETE FROM token_blacklist duplicate USING token_blacklist original '
+            'WHERE duplicate.token_digest = original.token_digest AND duplicate.id > original.id'
+        )
+    )
+
+    op.alter_column('token_blacklist', 'token_digest', nullable=False)
+    op.alter_column('token_blacklist', 'expires_at', nullable=False)
+    op.create_unique_constraint('token_blacklist_token_digest_key', 'token_blacklist', ['token_digest'])
+    op.create_index('ix_token_blacklist_expires_at', 'token_blacklist', ['expires_at'])
+    op.drop_column('token_blacklist', 'token')
+
+
+def downgrade() -> None:
+    # Raw tokens cannot be recovered from digests, the blacklist is emptied.
+    op.execute('DELETE FROM token_blacklist')
+    op.add_column('token_blacklist', sa.Column('token', sa.String))
+    op.drop_index('ix_token_blacklist_expires_at', table_name='token_blacklist')
+    op.drop_constraint('token_blacklist_token_digest_key', 'token_blacklist', type_='unique')
+    op.drop_column('token_blacklist', 'expires_at')
+    op.drop_column('token_blacklist', 'token_digest')
@@ -8,6 +8,9 @@ DEBUG = os.environ.get('DEBUG', 'False') == 'True'
 DATABASE_URL = os.environ['DATABASE_URL']
 DATABASE_MAX_POOL = int(os.environ.get('DATABASE_MAX_POOL', 5))
 DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW', 5))
+ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+DATABASE_PREPARED_STATEMENT_CACHE_SIZE = int(os.environ.get('DATABASE_PREPARED_STATEMENT_CACHE_SIZE', 256))
+SLOW_QUERY_THRESHOLD = float(os.environ.get('SLOW_QUERY_THRESHOLD', 0.5))
 
 REDIRECT_HOST_NAME = os.environ.get('REDIRECT_HOST_NAME', 'http://127.0.0.1:8000')
 
@@ -19,9 +22,51 @@ GOOGLE_CALLBACK = f'{REDIRECT_HOST_NAME}/auth/google/callback'
 
 REFRESH_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_CACHE_SIZE = int(os.environ.get('ACCESS_TOKEN_CACHE_SIZE', 10000))
 
 JWT_SECRET_KEY = os.environ['JWT_SECRET_KEY']
 JWT_REFRESH_SECRET_KEY = os.environ['JWT_REFRESH_SECRET_KEY']
 ALGORITHM = 'HS256'
 
 S3_BUCKET_NAME = os.environ['S3_BUCKET_NAME']
+
+S3_MULTIPART_THRESHOLD = int(os.environ.get('S3_MULTIPART_THRESHOLD', 16 * 1024 * 1024))
+S3_MULTIPART_CHUNK_SIZE = int(os.environ.get('S3_MULTIPART_CHUNK_SIZE', 16 * 1024 * 1024))
+S3_MAX_CONCURRENCY = int(os.environ.get('S3_MAX_CONCURRENCY', 8))
+
+UPLOAD_URL_EXPIRES = int(os.environ.get('UPLOAD_URL_EXPIRES', 3600))
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 5 * 1024 * 1024 * 1024))
+UPLOAD_MAX_PARTS = int(os.environ.get('UPLOAD_MAX_PARTS', 10000))
+UPLOAD_MIN_PART_SIZE = int(os.environ.get('UPLOAD_MIN_PART_SIZE', 5 * 1024 * 1024))
+
+PRESIGNED_URL_EXPIRES = int(os.environ.get('PRESIGNED_URL_EXPIRES', 1800))
+PRESIGNED_URL_CACHE_TTL = float(os.environ.get('PRESIGNED_URL_CACHE_TTL', PRESIGNED_URL_EXPIRES - 300))
+PRESIGNED_URL_CACHE_SIZE = int(os.environ.get('PRESIGNED_URL_CACHE_SIZE', 4096))
+
+CSV_CHUNK_SIZE = int(os.environ.get('CSV_CHUNK_SIZE', 1024 * 1024))
+CSV_WRITE_BATCH_SIZE = int(os.environ.get('CSV_WRITE_BATCH_SIZE', 10000))
+
+ANSWER_HISTORY_PAGE_SIZE = int(os.environ.get('ANSWER_HISTORY_PAGE_SIZE', 50))
+ANSWER_HISTORY_MAX_PAGE_SIZE = int(os.environ.get('ANSWER_HISTORY_MAX_PAGE_SIZE', 500))
+
+GROUND_TRUTH_CACHE_SIZE = int(os.environ.get('GROUND_TRUTH_CACHE_SIZE', 32))
+
+SCORING_PROCESSES = int(os.environ.get('SCORING_PROCESSES', os.cpu_count() or 1))
+SCORING_BATCH_SIZE = int(os.environ.get('SCORING_BATCH_SIZE', 16))
+SCORING_POLL_INTERVAL = float(os.environ.get('SCORING_POLL_INTERVAL', 1))
+SCORING_JOB_TIMEOUT = int(os.environ.get('SCORING_JOB_TIMEOUT', 600))
+SCORING_MAX_ATTEMPTS = int(os.environ.get('SCORING_MAX_ATTEMPTS', 3))
+RESCORING_BATCH_SIZE = int(os.environ.get('RESCORING_BATCH_SIZE', 500))
+RESCORING_MAX_PENDING_BATCHES = int(os.environ.get('RESCORING_MAX_PENDING_BATCHES', 2 * SCORING_PROCESSES))
+TOKEN_BLACKLIST_PURGE_INTERVAL = float(os.environ.get('TOKEN_BLACKLIST_PURGE_INTERVAL', 3600))
+
+TASK_SEARCH_PAGE_SIZE = int(os.environ.get('TASK_SEARCH_PAGE_SIZE', 20))
+TASK_SEARCH_MAX_PAGE_SIZE = int(os.environ.get('TASK_SEARCH_MAX_PAGE_SIZE', 100))
+
+LEADERBOARD_CACHE_SIZE = int(os.environ.get('LEADERBOARD_CACHE_SIZE', 256))
+LEADERBOARD_CACHE_TTL = float(os.environ.get('LEADERBOARD_CACHE_TTL', 30))
+LEADERBOARD_CACHE_PAGES = int(os.environ.get('LEADERBOARD_CACHE_PAGES', 16))
+
+PUBSUB_RECONNECT_INTERVAL = float(os.environ.get('PUBSUB_RECONNECT_INTERVAL', 5))
+PUBSUB_QUEUE_SIZE = int(os.environ.get('PUBSUB_QUEUE_SIZE', 100))
+SSE_KEEPALIVE_INTERVAL = float(os.environ.get('SSE_KEEPALIVE_INTERVAL', 15))
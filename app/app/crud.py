@@ -1,12 +1,25 @@
-from typing import Dict, Any
-from sqlalchemy import text, desc
-from sqlalchemy.orm import Session
-from dateutil.parser import parse as parse_date
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Tuple
+from sqlalchemy import DateTime, select, update, bindparam, desc, or_, and_, func, tuple_, literal_column
+from sqlalchemy.orm import Session, undefer
 from typing import Optional
 
 from . import models
 from . import schemas
-from app.app.sql_const import SCOREBOARD_SQL, DISTINCT_TASKS_SQL
+from .database import dumps
+from .utils import parse_date
+from .pubsub import SCORE_UPDATES_CHANNEL
+from .queries import (
+    BAN_TOKEN,
+    SCOREBOARD,
+    USER_RANK,
+    LEADERBOARD_UPSERT,
+    LEADERBOARD_LOCK,
+    LEADERBOARD_REBUILD,
+    RESCORE_ENQUEUE,
+    NOTIFY
+)
 
 
 def get_user(db: Session, provider_id: str):
@@ -28,40 +41,45 @@ def create_user(db: Session, user: schemas.User):
     return db_user
 
 
-def ban_token(db: Session, token: schemas.TokenBlacklist):
-    db_token = models.TokenBlacklist(
-        token=token.token
-    )
-    db.add(db_token)
+def ban_token(db: Session, token: schemas.TokenBlacklist) -> bool:
+    banned = db.execute(BAN_TOKEN, token.model_dump()).first()
     db.commit()
-    db.refresh(db_token)
+    return banned is not None
 
 
 def get_user_by_id(db: Session, user_id: int) -> models.User:
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 
+def update_row_in_db(db: Session, model, row_id: int, values: Dict[str, Any], *returning):
+    if not values:
+        return db.execute(select(*returning or (model.id,)).where(model.id == row_id)).first()
+
+    row = db.execute(
+        update(model).where(model.id == row_id).values(values).returning(*returning or (model.id,))
+    ).first()
+    db.commit()
+    return row
+
+
 def update_user_in_db(
         db: Session,
-        user_id: str,
+        user_id: int,
         fields_to_update: Dict[str, str]
 ):
-    user = get_user_by_id(db=db, user_id=user_id)
-
-    for key, value in fields_to_update.items():
-        setattr(user, key, value)
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    return update_row_in_db(db, models.User, user_id, fields_to_update)
 
 
 def get_all_functions(db: Session):
     return db.query(models.Function).all()
 
 
-def get_token(db: Session, token: str):
-    return db.query(models.TokenBlacklist).filter(models.TokenBlacklist.token == token).first()
+def purge_expired_tokens_in_db(db: Session) -> int:
+    purged = db.query(models.TokenBlacklist).filter(
+        models.TokenBlacklist.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return purged
 
 
 def create_task_in_db(db: Session, data: Dict[str, Any]):
@@ -85,82 +103,115 @@ def get_task_from_db(db: Session, task_id: int):
     return db.query(models.Task).filter(models.Task.id == task_id).first()
 
 
-def add_task_data_in_db(db: Session, task_id: int, uid: str):
-    task = get_task_from_db(db=db, task_id=task_id)
-    task.task_data = uid
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+def get_task_answer_from_db(db: Session, task_id: int):
+    return db.query(
+        models.Task.ans_version,
+        models.Task.task_ans
+    ).filter(
+        models.Task.id == task_id,
+        models.Task.task_ans.is_not(None)
+    ).first()
 
 
-def update_task_in_db(
-        db: Session,
-        task_id: int,
-        fields_to_update: Dict[str, str]
-):
-    task = get_task_from_db(db=db, task_id=task_id)
+def set_task_data_in_db(db: Session, task_id: int, uid: str):
+    return update_row_in_db(db, models.Task, task_id, {'task_data': uid})
 
-    for key, value in fields_to_update.items():
-        setattr(task, key, value)
 
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+def set_test_data_in_db(db: Session, task_id: int, uid: str):
+    return update_row_in_db(db, models.Task, task_id, {'test_data': uid})
+
+
+def set_task_answer_in_db(db: Session, task_id: int, task_ans: bytes):
+    return update_row_in_db(
+        db,
+        models.Task,
+        task_id,
+        {'task_ans': task_ans, 'ans_version': models.Task.ans_version + 1},
+        models.Task.id,
+        models.Task.ans_version
+    )
 
 
-def update_task_data_in_db(
+def update_task_in_db(
         db: Session,
         task_id: int,
-        uid: str
+        fields_to_update: Dict[str, Any]
 ):
-    task = get_task_from_db(db=db, task_id=task_id)
-    task.task_data = uid
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+    values = dict(fields_to_update)
+
+    for key in ('start_date', 'end_date'):
+        if values.get(key) is not None:
+            values[key] = parse_date(values[key])
+
+    return update_row_in_db(db, models.Task, task_id, values)
 
 
 def search_tasks_by_name_in_db(
         db: Session,
+        limit: int,
         name: Optional[str] = None,
         end_date: Optional[str] = None,
-        tag: Optional[str] = None
+        tags: Optional[List[str]] = None,
+        after: Optional[Tuple[bool, Optional[datetime], int]] = None
 ):
     tasks = db.query(models.Task)
 
     if name:
-        tasks = tasks.filter(models.Task.name.contains(name))
+        pattern = '%' + name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        tasks = tasks.filter(or_(
+            models.Task.search_vector.op('@@')(func.websearch_to_tsquery(models.TASK_SEARCH_CONFIG, name)),
+            models.Task.name.ilike(pattern, escape='\\')
+        ))
 
     if end_date:
         tasks = tasks.filter(models.Task.end_date <= parse_date(end_date))
 
-    if tag:
-        tasks = tasks.filter(models.Task.tags.contains([tag]))
+    if tags:
+        tasks = tasks.filter(models.Task.tags.contains(tags))
+
+    is_active = models.Task.is_active.is_(True)
+    no_end_date = literal_column(models.TASK_NO_END_DATE, DateTime)
+    end_date_key = func.coalesce(models.Task.end_date, no_end_date)
+
+    if after:
+        after_is_active, after_end_date, after_id = after
+        tasks = tasks.filter(
+            tuple_(is_active, end_date_key, models.Task.id) < tuple_(
+                after_is_active,
+                no_end_date if after_end_date is None else after_end_date,
+                after_id
+            )
+        )
 
     return tasks.order_by(
-        desc(models.Task.is_active.is_(True)),
-        desc(models.Task.end_date)
-    ).all()
+        desc(is_active),
+        desc(end_date_key),
+        desc(models.Task.id)
+    ).limit(limit).all()
 
 
 def change_task_status_in_db(db: Session, task_id: int):
-    task = get_task_from_db(db=db, task_id=task_id)
-    task.is_active = not task.is_active
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+    return update_row_in_db(
+        db,
+        models.Task,
+        task_id,
+        {'is_active': models.Task.is_active.is_not(True)},
+        models.Task.id,
+        models.Task.is_active
+    )
 
 
 def create_answer_in_db(
         db: Session,
         task_id: int,
         user_id: int,
-        task_ans: Dict
+        task_ans: bytes
 ):
     db_answer = models.Answer(
         task_id=task_id,
         user_id=user_id,
-        task_ans=task_ans
+        task_ans=task_ans,
+        score_job=[models.ScoreJob()]
     )
     db.add(db_answer)
     db.commit()
@@ -168,77 +219,366 @@ def create_answer_in_db(
     return db_answer
 
 
-def get_all_answers_for_task_in_db(db: Session, task_id: int):
-    with db.connection() as conn:
-        result = conn.execute(text(SCOREBOARD_SQL % {'task_id': task_id}))
-        return result.all()
+def get_answer_from_db(db: Session, answer_id: int) -> models.Answer:
+    return db.query(models.Answer).options(
+        undefer(models.Answer.task_ans)
+    ).filter(models.Answer.id == answer_id).first()
+
+
+def get_all_answers_for_task_in_db(
+        db: Session,
+        task_id: int,
+        limit: int,
+        offset: int = 0
+):
+    return db.execute(
+        SCOREBOARD,
+        {'task_id': task_id, 'limit': limit, 'offset': offset}
+    ).all()
+
+
+def get_user_rank_for_task_in_db(db: Session, task_id: int, user_id: int):
+    return db.execute(
+        USER_RANK,
+        {'task_id': task_id, 'user_id': user_id}
+    ).first()
 
 
 def get_user_answers_for_task_in_db(
         db: Session,
         task_id: int,
-        user_id: int
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None
 ):
-    return db.query(
-        models.Answer
+    answers = db.query(
+        models.Answer.id,
+        models.Answer.score,
+        models.Answer.added_at,
+        models.Answer.is_active
     ).filter(
         models.Answer.task_id == task_id,
         models.Answer.user_id == user_id,
         models.Answer.score.is_not(None),
         models.Answer.is_active.is_(True)
-    ).order_by(
-        desc(models.Answer.added_at)
-    ).all()
+    )
+
+    if after:
+        answers = answers.filter(tuple_(models.Answer.added_at, models.Answer.id) < tuple_(*after))
+
+    return answers.order_by(
+        desc(models.Answer.added_at),
+        desc(models.Answer.id)
+    ).limit(limit).all()
+
+
+def get_user_answer_data_from_db(
+        db: Session,
+        task_id: int,
+        user_id: int,
+        answer_id: int
+):
+    return db.query(
+        models.Answer.task_ans
+    ).filter(
+        models.Answer.id == answer_id,
+        models.Answer.task_id == task_id,
+        models.Answer.user_id == user_id,
+        models.Answer.task_ans.is_not(None)
+    ).scalar()
 
 
 def update_score_in_db(
         db: Session,
         answer_id: int,
-        score: float
+        score: float,
+        rank_score: float
 ):
-    db_answer = db.query(models.Answer).filter(models.Answer.id == answer_id).first()
-    db_answer.score = score
-    db.add(db_answer)
+    if not math.isfinite(score):
+        score = None
+
+    db_answer = db.execute(
+        update(models.Answer).where(
+            models.Answer.id == answer_id
+        ).values(score=score).returning(models.Answer.task_id, models.Answer.user_id)
+    ).one()
+
+    leaderboard_row = None
+
+    if score is not None:
+        lock_leaderboard_in_db(db=db, task_id=db_answer.task_id)
+        leaderboard_row = db.execute(
+            LEADERBOARD_UPSERT,
+            {'answer_id': answer_id, 'rank_score': rank_score}
+        ).first()
+
+    notify_in_db(
+        db=db,
+        channel=SCORE_UPDATES_CHANNEL,
+        payload={
+            'task_id': db_answer.task_id,
+            'user_id': db_answer.user_id,
+            'answer_id': answer_id,
+            'score': score,
+            'leaderboard': leaderboard_row is not None
+        }
+    )
+
     db.commit()
-    db.refresh(db_answer)
+    return leaderboard_row
+
+
+def lock_leaderboard_in_db(db: Session, task_id: int):
+    db.execute(LEADERBOARD_LOCK, {'task_id': task_id})
+
+
+def notify_in_db(db: Session, channel: str, payload: Dict[str, Any]):
+    db.execute(NOTIFY, {'channel': channel, 'payload': dumps(payload)})
 
 
 def get_all_tasks_for_user_id_db(db: Session, user_id: int):
-    with db.connection() as conn:
-        tasks_ids = conn.execute(text(DISTINCT_TASKS_SQL % {'user_id': user_id})).all()
-        return [
-            get_task_from_db(db=db, task_id=task_row[0])
-            for task_row in tasks_ids
-        ]
-
-
-def add_task_answer_in_db(db: Session, task_id: int, task_ans: dict):
-    task = get_task_from_db(db=db, task_id=task_id)
-    task.task_ans = task_ans
-    db.add(task)
+    submissions = db.query(
+        models.Answer.task_id,
+        func.count().label('submissions'),
+        func.max(models.Answer.added_at).label('last_submitted_at')
+    ).filter(
+        models.Answer.user_id == user_id
+    ).group_by(models.Answer.task_id).subquery()
+
+    return db.query(
+        models.Task,
+        submissions.c.submissions,
+        models.Leaderboard.score.label('best_score')
+    ).join(
+        submissions,
+        submissions.c.task_id == models.Task.id
+    ).outerjoin(
+        models.Leaderboard,
+        and_(models.Leaderboard.task_id == models.Task.id, models.Leaderboard.user_id == user_id)
+    ).order_by(
+        desc(submissions.c.last_submitted_at)
+    ).all()
+
+
+def claim_score_jobs_in_db(
+        db: Session,
+        limit: int,
+        timeout: int,
+        max_attempts: int
+) -> List[Tuple[int, int]]:
+    now = datetime.now()
+    db.execute(
+        update(models.ScoreJob).where(
+            models.ScoreJob.status == 'running',
+            models.ScoreJob.started_at < now - timedelta(seconds=timeout),
+            models.ScoreJob.attempts >= max_attempts
+        ).values(
+            status='failed',
+            finished_at=now,
+            error=func.coalesce(models.ScoreJob.error, 'Timed out')
+        )
+    )
+    jobs = db.query(
+        models.ScoreJob
+    ).filter(
+        or_(
+            models.ScoreJob.status == 'pending',
+            and_(
+                models.ScoreJob.status == 'running',
+                models.ScoreJob.started_at < now - timedelta(seconds=timeout),
+                models.ScoreJob.attempts < max_attempts
+            )
+        )
+    ).order_by(
+        models.ScoreJob.id
+    ).limit(
+        limit
+    ).with_for_update(
+        skip_locked=True
+    ).all()
+
+    claimed = []
+
+    for job in jobs:
+        job.status = 'running'
+        job.started_at = now
+        job.attempts += 1
+        claimed.append((job.id, job.answer_id))
+
+    db.commit()
+    return claimed
+
+
+def finish_score_job_in_db(
+        db: Session,
+        job_id: int,
+        max_attempts: int,
+        error: Optional[str] = None,
+        retry: bool = True
+):
+    job = db.query(models.ScoreJob).filter(models.ScoreJob.id == job_id).first()
+    job.error = error
+
+    if error is None:
+        job.status = 'done'
+        job.finished_at = datetime.now()
+    elif not retry or job.attempts >= max_attempts:
+        job.status = 'failed'
+        job.finished_at = datetime.now()
+    else:
+        job.status = 'pending'
+
+    db.add(job)
+    db.commit()
+
+
+def create_rescore_job_in_db(db: Session, task_id: int) -> Optional[int]:
+    job_id = db.execute(RESCORE_ENQUEUE, {'task_id': task_id}).scalar()
+    db.commit()
+    return job_id
+
+
+def get_rescore_job_from_db(db: Session, job_id: int) -> models.RescoreJob:
+    return db.query(models.RescoreJob).filter(models.RescoreJob.id == job_id).first()
+
+
+def claim_rescore_job_in_db(
+        db: Session,
+        timeout: int,
+        max_attempts: int
+) -> Optional[Tuple[int, int]]:
+    now = datetime.now()
+    db.execute(
+        update(models.RescoreJob).where(
+            models.RescoreJob.status == 'running',
+            models.RescoreJob.updated_at < now - timedelta(seconds=timeout),
+            models.RescoreJob.attempts >= max_attempts
+        ).values(
+            status='failed',
+            finished_at=now,
+            error=func.coalesce(models.RescoreJob.error, 'Timed out')
+        )
+    )
+    job = db.query(
+        models.RescoreJob
+    ).filter(
+        or_(
+            models.RescoreJob.status == 'pending',
+            and_(
+                models.RescoreJob.status == 'running',
+                models.RescoreJob.updated_at < now - timedelta(seconds=timeout),
+                models.RescoreJob.attempts < max_attempts
+            )
+        )
+    ).order_by(
+        models.RescoreJob.id
+    ).limit(
+        1
+    ).with_for_update(
+        skip_locked=True
+    ).first()
+
+    if job is None:
+        db.commit()
+        return None
+
+    if job.status == 'pending':
+        job.started_at = now
+        job.processed = 0
+        job.last_answer_id = None
+        job.total = db.query(func.count(models.Answer.id)).filter(
+            models.Answer.task_id == job.task_id,
+            models.Answer.is_active.is_(True)
+        ).scalar()
+
+    job.status = 'running'
+    job.updated_at = now
+    job.attempts += 1
+    claimed = (job.id, job.task_id)
+
     db.commit()
-    db.refresh(task)
+    return claimed
+
+
+def get_active_answer_ids_in_db(db: Session, task_id: int, limit: int, after: Optional[int] = None) -> List[int]:
+    answer_ids = select(models.Answer.id).where(
+        models.Answer.task_id == task_id,
+        models.Answer.is_active.is_(True)
+    )
+
+    if after is not None:
+        answer_ids = answer_ids.where(models.Answer.id > after)
+
+    return db.execute(answer_ids.order_by(models.Answer.id).limit(limit)).scalars().all()
+
+
+def get_active_answers_in_db(db: Session, task_id: int, first_id: int, last_id: int) -> List[Tuple[int, bytes]]:
+    return db.execute(
+        select(
+            models.Answer.id,
+            models.Answer.task_ans
+        ).where(
+            models.Answer.task_id == task_id,
+            models.Answer.is_active.is_(True),
+            models.Answer.id.between(first_id, last_id)
+        ).order_by(
+            models.Answer.id
+        )
+    ).all()
 
 
-def update_task_answer_in_db(db: Session, task_id: int, task_ans: dict):
-    task = get_task_from_db(db=db, task_id=task_id)
-    task.task_ans = task_ans
-    db.add(task)
+def save_rescored_answers_in_db(
+        db: Session,
+        job_id: int,
+        scores: List[Tuple[int, Optional[float]]],
+        last_answer_id: int
+):
+    db.execute(
+        update(models.Answer.__table__).where(
+            models.Answer.__table__.c.id == bindparam('answer_id')
+        ).values(
+            score=bindparam('score')
+        ),
+        [{'answer_id': answer_id, 'score': score} for answer_id, score in scores]
+    )
+    db.execute(
+        update(models.RescoreJob).where(
+            models.RescoreJob.id == job_id
+        ).values(
+            processed=models.RescoreJob.processed + len(scores),
+            last_answer_id=last_answer_id,
+            updated_at=datetime.now()
+        )
+    )
     db.commit()
-    db.refresh(task)
 
 
-def add_test_data_in_db(db: Session, task_id: int, uid: str):
-    task = get_task_from_db(db=db, task_id=task_id)
-    task.test_data = uid
-    db.add(task)
+def rebuild_leaderboard_in_db(db: Session, task_id: int, greater_is_better: bool):
+    lock_leaderboard_in_db(db=db, task_id=task_id)
+    db.query(models.Leaderboard).filter(models.Leaderboard.task_id == task_id).delete(synchronize_session=False)
+    db.execute(LEADERBOARD_REBUILD, {'task_id': task_id, 'sign': 1 if greater_is_better else -1})
+    notify_in_db(db=db, channel=SCORE_UPDATES_CHANNEL, payload={'task_id': task_id, 'rescored': True})
     db.commit()
-    db.refresh(task)
 
 
-def update_test_data_in_db(db: Session, task_id: int, uid: str):
-    task = get_task_from_db(db=db, task_id=task_id)
-    task.test_data = uid
-    db.add(task)
+def finish_rescore_job_in_db(
+        db: Session,
+        job_id: int,
+        max_attempts: int,
+        error: Optional[str] = None,
+        retry: bool = True
+):
+    job = db.query(models.RescoreJob).filter(models.RescoreJob.id == job_id).first()
+    job.error = error
+
+    if error is None:
+        job.status = 'done'
+        job.finished_at = datetime.now()
+    elif not retry or job.attempts >= max_attempts:
+        job.status = 'failed'
+        job.finished_at = datetime.now()
+    else:
+        job.status = 'pending'
+
+    db.add(job)
     db.commit()
-    db.refresh(task)
@@ -0,0 +1,44 @@
+"""Async twins of the crud functions used while serving requests.
+
+A crud function gets a twin here only when a router or a request-path helper
+such as leaderboard calls it. The worker calls crud directly with a sync Session.
+"""
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud
+
+
+def run_in_session(function: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    @wraps(function)
+    async def wrapper(db: AsyncSession, **kwargs):
+        return await db.run_sync(lambda session: function(db=session, **kwargs))
+
+    return wrapper
+
+
+get_user = run_in_session(crud.get_user)
+create_user = run_in_session(crud.create_user)
+ban_token = run_in_session(crud.ban_token)
+get_user_by_id = run_in_session(crud.get_user_by_id)
+update_user_in_db = run_in_session(crud.update_user_in_db)
+get_all_functions = run_in_session(crud.get_all_functions)
+create_task_in_db = run_in_session(crud.create_task_in_db)
+get_task_from_db = run_in_session(crud.get_task_from_db)
+get_task_answer_from_db = run_in_session(crud.get_task_answer_from_db)
+update_task_in_db = run_in_session(crud.update_task_in_db)
+set_task_data_in_db = run_in_session(crud.set_task_data_in_db)
+set_test_data_in_db = run_in_session(crud.set_test_data_in_db)
+set_task_answer_in_db = run_in_session(crud.set_task_answer_in_db)
+search_tasks_by_name_in_db = run_in_session(crud.search_tasks_by_name_in_db)
+change_task_status_in_db = run_in_session(crud.change_task_status_in_db)
+create_answer_in_db = run_in_session(crud.create_answer_in_db)
+get_all_answers_for_task_in_db = run_in_session(crud.get_all_answers_for_task_in_db)
+get_user_rank_for_task_in_db = run_in_session(crud.get_user_rank_for_task_in_db)
+get_user_answers_for_task_in_db = run_in_session(crud.get_user_answers_for_task_in_db)
+get_user_answer_data_from_db = run_in_session(crud.get_user_answer_data_from_db)
+get_all_tasks_for_user_id_db = run_in_session(crud.get_all_tasks_for_user_id_db)
+create_rescore_job_in_db = run_in_session(crud.create_rescore_job_in_db)
+get_rescore_job_from_db = run_in_session(crud.get_rescore_job_from_db)
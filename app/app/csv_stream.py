@@ -0,0 +1,102 @@
+import codecs
+import csv
+from array import array
+from typing import BinaryIO, Iterator, List, Tuple
+
+import numpy as np
+
+from .config import CSV_CHUNK_SIZE, CSV_WRITE_BATCH_SIZE
+
+FIELD_NAMES = (
+    'id',
+    'result'
+)
+
+
+class CSVFormatError(ValueError):
+    pass
+
+
+def iter_lines(file: BinaryIO, chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    tail = ''
+
+    while True:
+        chunk = file.read(chunk_size)
+        lines = (tail + decoder.decode(chunk, final=not chunk)).splitlines(keepends=True)
+        tail = ''
+
+        if lines and chunk and not lines[-1].endswith(('\n', '\r')):
+            tail = lines.pop()
+
+        yield from lines
+
+        if not chunk:
+            return
+
+
+def parse_record(row: List[str], line_num: int) -> Tuple[int, float]:
+    if len(row) != len(FIELD_NAMES):
+        raise CSVFormatError(f'unexpected record length on line {line_num}')
+
+    id, result = row
+
+    try:
+        id = int(id)
+    except ValueError:
+        raise CSVFormatError(f'id {id!r} on line {line_num} is not an integer')
+
+    try:
+        return id, float(result)
+    except ValueError:
+        raise CSVFormatError(f'result {result!r} on line {line_num} is not a number')
+
+
+def read_answers_csv(file: BinaryIO, chunk_size: int = CSV_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    reader = csv.reader(iter_lines(file, chunk_size), delimiter=',')
+
+    header = next(reader, None)
+
+    if header is None or tuple(field.strip() for field in header) != FIELD_NAMES:
+        raise CSVFormatError('bad header')
+
+    ids = array('q')
+    values = array('d')
+
+    for row in reader:
+        if not row:
+            continue
+
+        id, result = parse_record(row, reader.line_num)
+
+        try:
+            ids.append(id)
+        except OverflowError:
+            raise CSVFormatError(f'id {id} on line {reader.line_num} is not an int64 integer')
+
+        values.append(result)
+
+    if not ids:
+        raise CSVFormatError('no records')
+
+    ids = np.frombuffer(ids, dtype=np.int64)
+    values = np.frombuffer(values, dtype=np.float64)
+
+    order = np.argsort(ids, kind='stable')
+    ids = ids[order]
+    values = values[order]
+
+    duplicates = np.flatnonzero(ids[1:] == ids[:-1])
+
+    if duplicates.size:
+        raise CSVFormatError(f'duplicate id {ids[duplicates[0]]}')
+
+    return ids, values
+
+
+def iter_answers_csv(ids: np.ndarray, values: np.ndarray, batch_size: int = CSV_WRITE_BATCH_SIZE) -> Iterator[bytes]:
+    yield (','.join(FIELD_NAMES) + '\n').encode()
+
+    for start in range(0, ids.size, batch_size):
+        rows = zip(ids[start:start + batch_size].tolist(), values[start:start + batch_size].tolist())
+        yield ''.join(f'{id},{result!r}\n' for id, result in rows).encode()
@@ -1,9 +1,18 @@
 import json
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from .config import DATABASE_MAX_POOL, DATABASE_URL, DATABASE_MAX_OVERFLOW
+from .config import (
+    DATABASE_MAX_POOL,
+    DATABASE_URL,
+    DATABASE_MAX_OVERFLOW,
+    ASYNC_DATABASE_URL,
+    DATABASE_PREPARED_STATEMENT_CACHE_SIZE
+)
+from .queries import instrument_engine
 
 
 def dumps(d):
@@ -19,4 +28,22 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    make_url(ASYNC_DATABASE_URL or DATABASE_URL).set(drivername='postgresql+asyncpg').update_query_dict(
+        {'prepared_statement_cache_size': str(DATABASE_PREPARED_STATEMENT_CACHE_SIZE)}
+    ),
+    pool_size=DATABASE_MAX_POOL,
+    max_overflow=DATABASE_MAX_OVERFLOW,
+    json_serializer=dumps
+)
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
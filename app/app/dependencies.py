@@ -1,4 +1,4 @@
-from .database import SessionLocal
+from .database import SessionLocal, AsyncSessionLocal
 from .boto3 import s3
 
 
@@ -10,5 +10,10 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_s3():
     return s3
@@ -0,0 +1,94 @@
+import hashlib
+import json
+from typing import NamedTuple, Optional
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import LRUCache
+from .crud_async import get_all_answers_for_task_in_db
+from .pubsub import broker
+from .config import LEADERBOARD_CACHE_SIZE, LEADERBOARD_CACHE_TTL, LEADERBOARD_CACHE_PAGES
+
+
+class LeaderboardPage(NamedTuple):
+
+    body: bytes
+    etag: str
+
+
+leaderboard_cache = LRUCache(maxsize=LEADERBOARD_CACHE_SIZE, ttl=LEADERBOARD_CACHE_TTL)
+
+
+async def get_leaderboard_page(db: AsyncSession, task_id: int, limit: int, offset: int) -> LeaderboardPage:
+    pages = leaderboard_cache.get(task_id)
+
+    if pages is None:
+        pages = LRUCache(maxsize=LEADERBOARD_CACHE_PAGES)
+        leaderboard_cache.set(task_id, pages)
+
+    page = pages.get((limit, offset))
+
+    if page is not None:
+        return page
+
+    answers = await get_all_answers_for_task_in_db(db=db, task_id=task_id, limit=limit, offset=offset)
+    body = orjson.dumps([
+        {
+            'user_id': user_id,
+            'name': name,
+            'surname': surname,
+            'score': score
+        }
+        for score, user_id, name, surname in answers
+    ])
+
+    page = LeaderboardPage(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+    pages.set((limit, offset), page)
+    return page
+
+
+def invalidate_leaderboard(task_id: int) -> None:
+    leaderboard_cache.pop(task_id)
+
+
+def handle_score_update(payload: Optional[str]) -> None:
+    if payload is None:
+        leaderboard_cache.clear()
+        return
+
+    update = json.loads(payload)
+    task_id = update['task_id']
+
+    if update.get('rescored'):
+        invalidate_leaderboard(task_id)
+        broker.publish(leaderboard_topic(task_id), {'rescored': True})
+        return
+
+    broker.publish(score_topic(task_id, update['user_id']), update)
+
+    if update['leaderboard']:
+        invalidate_leaderboard(task_id)
+        broker.publish(
+            leaderboard_topic(task_id),
+            {
+                'user_id': update['user_id'],
+                'score': update['score']
+            }
+        )
+
+
+def leaderboard_topic(task_id: int):
+    return ('leaderboard', task_id)
+
+
+def score_topic(task_id: int, user_id: int):
+    return ('score', task_id, user_id)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
@@ -1,19 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from .config import DEBUG
-from .routers import auth, user, functions, tasks, answers
+from .routers import auth, user, functions, tasks, answers, stats
 from .database import engine
+from .leaderboard import handle_score_update
+from .pubsub import PostgresListener, SCORE_UPDATES_CHANNEL
 from . import models
 
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = PostgresListener(channel=SCORE_UPDATES_CHANNEL, callback=handle_score_update)
+    listener.start()
+
+    try:
+        yield
+    finally:
+        listener.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 if not DEBUG:
-    app = FastAPI(docs_url=None, redoc_url=None)
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse, docs_url=None, redoc_url=None)
 
 app.include_router(router=auth.router)
 app.include_router(router=user.router)
 app.include_router(router=functions.router)
 app.include_router(router=tasks.router)
 app.include_router(router=answers.router)
+app.include_router(router=stats.router)
@@ -0,0 +1,162 @@
+from typing import Callable, Dict, Iterable, NamedTuple
+
+import numpy as np
+
+
+class ConfusionMatrix(NamedTuple):
+
+    true_positives: int
+    false_positives: int
+    false_negatives: int
+    matches: int
+    total: int
+
+    @property
+    def accuracy(self) -> float:
+        return self.matches / self.total
+
+    @property
+    def precision(self) -> float:
+        predicted_positives = self.true_positives + self.false_positives
+
+        if predicted_positives == 0:
+            return 0.0
+
+        return self.true_positives / predicted_positives
+
+    @property
+    def recall(self) -> float:
+        real_positives = self.true_positives + self.false_negatives
+
+        if real_positives == 0:
+            return 0.0
+
+        return self.true_positives / real_positives
+
+    @property
+    def f1_score(self) -> float:
+        precision = self.precision
+        recall = self.recall
+
+        if precision + recall == 0:
+            return 0.0
+
+        return 2 * (precision * recall) / (precision + recall)
+
+
+class Metric(NamedTuple):
+
+    name: str
+    calc: Callable
+    uses_confusion_matrix: bool
+    greater_is_better: bool
+
+    def rank_score(self, score: float) -> float:
+        return score if self.greater_is_better else -score
+
+
+METRICS: Dict[str, Metric] = {}
+
+
+def register_metric(
+        name: str,
+        uses_confusion_matrix: bool = False,
+        greater_is_better: bool = True
+) -> Callable:
+    def decorator(calc: Callable) -> Callable:
+        METRICS[name] = Metric(
+            name=name,
+            calc=calc,
+            uses_confusion_matrix=uses_confusion_matrix,
+            greater_is_better=greater_is_better
+        )
+        return calc
+
+    return decorator
+
+
+def get_metric(name: str) -> Metric:
+    try:
+        return METRICS[name]
+    except KeyError:
+        raise ValueError('Metric name is not found')
+
+
+def confusion_matrix(y_real: np.ndarray, y_predicted: np.ndarray) -> ConfusionMatrix:
+    real_positive = y_real == 1
+    predicted_positive = y_predicted == 1
+
+    return ConfusionMatrix(
+        true_positives=int(np.count_nonzero(real_positive & predicted_positive)),
+        false_positives=int(np.count_nonzero((y_real == 0) & predicted_positive)),
+        false_negatives=int(np.count_nonzero(real_positive & (y_predicted == 0))),
+        matches=int(np.count_nonzero(y_real == y_predicted)),
+        total=y_real.size
+    )
+
+
+@register_metric('MSE', greater_is_better=False)
+def mse(y_real: np.ndarray, y_predicted: np.ndarray) -> float:
+    diff = y_real - y_predicted
+    return float(np.dot(diff, diff) / diff.size)
+
+
+@register_metric('MAE', greater_is_better=False)
+def mae(y_real: np.ndarray, y_predicted: np.ndarray) -> float:
+    return float(np.mean(np.abs(y_real - y_predicted)))
+
+
+@register_metric('MAPE', greater_is_better=False)
+def mape(y_real: np.ndarray, y_predicted: np.ndarray) -> float:
+    return float(np.mean(np.abs((y_real - y_predicted) / y_real)))
+
+
+@register_metric('Accuracy', uses_confusion_matrix=True)
+def accuracy(matrix: ConfusionMatrix) -> float:
+    return matrix.accuracy
+
+
+@register_metric('Precision', uses_confusion_matrix=True)
+def precision(matrix: ConfusionMatrix) -> float:
+    return matrix.precision
+
+
+@register_metric('Recall', uses_confusion_matrix=True)
+def recall(matrix: ConfusionMatrix) -> float:
+    return matrix.recall
+
+
+@register_metric('F1Score', uses_confusion_matrix=True)
+def f1_score(matrix: ConfusionMatrix) -> float:
+    return matrix.f1_score
+
+
+def calculate_metrics(
+        names: Iterable[str],
+        y_real: np.ndarray,
+        y_predicted: np.ndarray
+) -> Dict[str, float]:
+    y_real = np.asarray(y_real, dtype=np.float64)
+    y_predicted = np.asarray(y_predicted, dtype=np.float64)
+
+    if y_real.shape != y_predicted.shape or not y_real.size:
+        raise ValueError('Answers shape is not correct')
+
+    matrix = None
+    result = {}
+
+    for name in names:
+        metric = get_metric(name)
+
+        if metric.uses_confusion_matrix:
+            if matrix is None:
+                matrix = confusion_matrix(y_real, y_predicted)
+            result[name] = metric.calc(matrix)
+        else:
+            result[name] = metric.calc(y_real, y_predicted)
+
+    return result
+
+
+def calculate_metric(name: str, y_real: np.ndarray, y_predicted: np.ndarray) -> float:
+    return calculate_metrics((name,), y_real, y_predicted)[name]
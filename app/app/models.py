@@ -7,15 +7,27 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
-    JSON,
-    Float
+    LargeBinary,
+    Float,
+    Index,
+    Computed,
+    DDL,
+    event,
+    text
 )
 from sqlalchemy_utils import EmailType
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 
 from .database import Base
 
+TASK_SEARCH_CONFIG = 'simple'
+TASK_NO_END_DATE = "'-infinity'::timestamp"
+TASK_SEARCH_DOCUMENT = (
+    f"to_tsvector('{TASK_SEARCH_CONFIG}', "
+    "coalesce(name, '') || ' ' || coalesce(short_description, '') || ' ' || coalesce(description, ''))"
+)
+
 
 class User(Base):
 
@@ -40,12 +52,19 @@ class TokenBlacklist(Base):
     __tablename__ = 'token_blacklist'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    token = Column(String)
+    token_digest = Column(LargeBinary, nullable=False, unique=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
 
 
 class Task(Base):
 
     __tablename__ = 'task'
+    __table_args__ = (
+        Index('ix_task_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_task_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_task_tags', 'tags', postgresql_using='gin'),
+        Index('ix_task_catalog', text('(is_active IS TRUE)'), text(f'COALESCE(end_date, {TASK_NO_END_DATE})'), 'id'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String)
@@ -56,15 +75,20 @@ class Task(Base):
     function_id = Column(Integer, ForeignKey('function.id'))
     task_data = Column(String, nullable=True, default=None)
     test_data = Column(String, nullable=True, default=None)
-    task_ans = Column(JSON)
+    task_ans = deferred(Column(LargeBinary))
+    ans_version = Column(Integer, nullable=False, default=0, server_default='0')
     ans_type = Column(String)
     tags = Column(ARRAY(String))
     is_active = Column(Boolean, default=False)
+    search_vector = deferred(Column(TSVECTOR, Computed(TASK_SEARCH_DOCUMENT, persisted=True)))
 
     function = relationship('Function', back_populates='task')
     answer = relationship('Answer', back_populates='task')
 
 
+event.listen(Task.__table__, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
+
 class Function(Base):
 
     __tablename__ = 'function'
@@ -78,14 +102,90 @@ class Function(Base):
 class Answer(Base):
 
     __tablename__ = 'answer'
+    __table_args__ = (
+        Index(
+            'ix_answer_task_user_scored',
+            'task_id',
+            'user_id',
+            'added_at',
+            'id',
+            postgresql_where=text('score IS NOT NULL AND is_active IS TRUE')
+        ),
+        Index('ix_answer_user_task_added_at', 'user_id', 'task_id', 'added_at'),
+        Index('ix_answer_task_active', 'task_id', 'id', postgresql_where=text('is_active IS TRUE')),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     task_id = Column(Integer, ForeignKey('task.id'))
     user_id = Column(Integer, ForeignKey('user.id'))
-    task_ans = Column(JSON)
+    task_ans = deferred(Column(LargeBinary))
     score = Column(Float, nullable=True, default=None)
     added_at = Column(DateTime, default=datetime.now)
     is_active = Column(Boolean, default=True)
 
     task = relationship('Task', back_populates='answer')
     user = relationship('User', back_populates='answer')
+    score_job = relationship('ScoreJob', back_populates='answer')
+
+
+class ScoreJob(Base):
+
+    __tablename__ = 'score_job'
+    __table_args__ = (
+        Index(
+            'ix_score_job_queue',
+            'id',
+            postgresql_where=text("status IN ('pending', 'running')")
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    answer_id = Column(Integer, ForeignKey('answer.id'), nullable=False)
+    status = Column(String, nullable=False, default='pending', server_default='pending')
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    error = Column(Text, nullable=True, default=None)
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime, nullable=True, default=None)
+    finished_at = Column(DateTime, nullable=True, default=None)
+
+    answer = relationship('Answer', back_populates='score_job')
+
+
+class RescoreJob(Base):
+
+    __tablename__ = 'rescore_job'
+    __table_args__ = (
+        Index(
+            'ix_rescore_job_queue',
+            'id',
+            postgresql_where=text("status IN ('pending', 'running')")
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(Integer, ForeignKey('task.id'), nullable=False)
+    status = Column(String, nullable=False, default='pending', server_default='pending')
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    total = Column(Integer, nullable=True, default=None)
+    processed = Column(Integer, nullable=False, default=0, server_default='0')
+    last_answer_id = Column(Integer, nullable=True, default=None)
+    error = Column(Text, nullable=True, default=None)
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime, nullable=True, default=None)
+    updated_at = Column(DateTime, nullable=True, default=None)
+    finished_at = Column(DateTime, nullable=True, default=None)
+
+
+class Leaderboard(Base):
+
+    __tablename__ = 'leaderboard'
+    __table_args__ = (
+        Index('ix_leaderboard_task_rank', 'task_id', 'rank_score', 'answer_id'),
+    )
+
+    task_id = Column(Integer, ForeignKey('task.id'), primary_key=True)
+    user_id = Column(Integer, ForeignKey('user.id'), primary_key=True)
+    answer_id = Column(Integer, ForeignKey('answer.id'), nullable=False)
+    score = Column(Float, nullable=False)
+    rank_score = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now)
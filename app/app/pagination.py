@@ -0,0 +1,21 @@
+import base64
+import binascii
+from typing import Any, List
+
+import orjson
+
+
+def encode_cursor(*values: Any) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(values)).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, orjson.JSONDecodeError):
+        raise ValueError('Cursor is not correct')
+
+    if not isinstance(values, list):
+        raise ValueError('Cursor is not correct')
+
+    return values
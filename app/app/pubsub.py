@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, Optional, Set
+
+import orjson
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy.engine import make_url
+
+from .config import (
+    DATABASE_URL,
+    PUBSUB_RECONNECT_INTERVAL,
+    PUBSUB_QUEUE_SIZE,
+    SSE_KEEPALIVE_INTERVAL
+)
+
+SCORE_UPDATES_CHANNEL = 'score_updates'
+
+logger = logging.getLogger(__name__)
+
+
+class Broker:
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Dict[Hashable, Set[asyncio.Queue]] = defaultdict(set)
+
+    @contextmanager
+    def subscribe(self, topic: Hashable) -> Iterator[asyncio.Queue]:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[topic].add(queue)
+
+        try:
+            yield queue
+        finally:
+            self._subscribers[topic].discard(queue)
+
+            if not self._subscribers[topic]:
+                del self._subscribers[topic]
+
+    def publish(self, topic: Hashable, message: Any) -> None:
+        for queue in self._subscribers.get(topic, ()):
+            if queue.full():
+                queue.get_nowait()
+
+            queue.put_nowait(message)
+
+
+broker = Broker(queue_size=PUBSUB_QUEUE_SIZE)
+
+
+async def event_stream(topic: Hashable, event: str) -> AsyncIterator[str]:
+    with broker.subscribe(topic) as queue:
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+
+            yield f'event: {event}\ndata: {orjson.dumps(message).decode()}\n\n'
+
+
+def get_dsn() -> str:
+    return make_url(DATABASE_URL).set(drivername='postgresql').render_as_string(hide_password=False)
+
+
+class PostgresListener:
+
+    def __init__(self, channel: str, callback: Callable[[Optional[str]], None]) -> None:
+        self.channel = channel
+        self.callback = callback
+        self.connection: Optional[psycopg2.extensions.connection] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fileno: Optional[int] = None
+        self._connecting: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._connect()
+
+    def stop(self) -> None:
+        self._disconnect()
+        self.loop = None
+
+    def _connect(self) -> None:
+        if self.loop is None:
+            return
+
+        self._connecting = self.loop.create_task(self._listen())
+
+    def _open_connection(self) -> psycopg2.extensions.connection:
+        connection = psycopg2.connect(get_dsn())
+
+        try:
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.channel}')
+        except psycopg2.Error:
+            connection.close()
+            raise
+
+        return connection
+
+    async def _listen(self) -> None:
+        if self.loop is None:
+            return
+
+        try:
+            connection = await self.loop.run_in_executor(None, self._open_connection)
+        except psycopg2.Error:
+            logger.exception('Cannot listen to %s', self.channel)
+
+            if self.loop is not None:
+                self.loop.call_later(PUBSUB_RECONNECT_INTERVAL, self._connect)
+            return
+
+        if self.loop is None:
+            connection.close()
+            return
+
+        self.connection = connection
+        self._fileno = connection.fileno()
+        self.loop.add_reader(self._fileno, self._poll)
+
+    def _disconnect(self) -> None:
+        if self._fileno is not None:
+            self.loop.remove_reader(self._fileno)
+            self._fileno = None
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _poll(self) -> None:
+        try:
+            self.connection.poll()
+        except psycopg2.Error:
+            logger.exception('Lost connection while listening to %s', self.channel)
+            self._disconnect()
+            self.callback(None)
+            self.loop.call_later(PUBSUB_RECONNECT_INTERVAL, self._connect)
+            return
+
+        while self.connection.notifies:
+            self.callback(self.connection.notifies.pop(0).payload)
@@ -0,0 +1,101 @@
+import logging
+import time
+from threading import Lock
+from typing import Any, Dict
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+
+from . import sql_const
+from .config import SLOW_QUERY_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+QUERIES: Dict[str, TextClause] = {}
+
+
+class QueryStats:
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_time': self.total_time,
+            'mean_time': self.total_time / self.count if self.count else 0.0,
+            'max_time': self.max_time
+        }
+
+
+_query_names: Dict[int, str] = {}
+_query_stats: Dict[str, QueryStats] = {}
+_stats_lock = Lock()
+
+
+def register_query(name: str, sql: str) -> TextClause:
+    statement = text(sql)
+    QUERIES[name] = statement
+    _query_names[id(statement)] = name
+    return statement
+
+
+SCOREBOARD = register_query('scoreboard', sql_const.SCOREBOARD_SQL)
+USER_RANK = register_query('user_rank', sql_const.USER_RANK_SQL)
+LEADERBOARD_UPSERT = register_query('leaderboard_upsert', sql_const.LEADERBOARD_UPSERT_SQL)
+LEADERBOARD_LOCK = register_query('leaderboard_lock', sql_const.LEADERBOARD_LOCK_SQL)
+LEADERBOARD_REBUILD = register_query('leaderboard_rebuild', sql_const.LEADERBOARD_REBUILD_SQL)
+RESCORE_ENQUEUE = register_query('rescore_enqueue', sql_const.RESCORE_ENQUEUE_SQL)
+BAN_TOKEN = register_query('ban_token', sql_const.BAN_TOKEN_SQL)
+NOTIFY = register_query('notify', sql_const.NOTIFY_SQL)
+
+
+def get_query_stats() -> Dict[str, Dict[str, Any]]:
+    with _stats_lock:
+        return {name: stats.as_dict() for name, stats in _query_stats.items()}
+
+
+def reset_query_stats() -> None:
+    with _stats_lock:
+        _query_stats.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info['query_started_at'].pop()
+    compiled = getattr(context, 'compiled', None)
+    name = _query_names.get(id(compiled.statement)) if compiled is not None else None
+
+    if name is not None:
+        with _stats_lock:
+            _query_stats.setdefault(name, QueryStats()).add(elapsed)
+
+    if elapsed >= SLOW_QUERY_THRESHOLD:
+        logger.warning('Slow query %s took %.3fs: %s', name or '<orm>', elapsed, statement)
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is None or exception_context.execution_context is None:
+        return
+
+    started_at = conn.info.get('query_started_at')
+    if started_at:
+        started_at.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
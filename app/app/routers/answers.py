@@ -1,35 +1,40 @@
-import csv
-from io import StringIO
+from typing import Optional
+
+import numpy as np
 from fastapi import (
     APIRouter,
     HTTPException,
     Depends,
     UploadFile,
-    BackgroundTasks
+    Query,
+    Header
 )
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from csvvalidator import CSVValidator
-
-from app.app.models import Answer
-from app.app.dependencies import get_db
-from app.app.utils import (
-    get_current_user_id_or_403,
-    check_csv_records,
-    MAE,
-    MAPE,
-    MSE,
-    Accuracy,
-    Precision,
-    Recall,
-    F1Score
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app.dependencies import get_async_db
+from app.app.config import ANSWER_HISTORY_PAGE_SIZE, ANSWER_HISTORY_MAX_PAGE_SIZE
+from app.app.utils import get_current_user_id_or_403, get_stream_user_id_or_403, parse_date
+from app.app.schemas import ReturnAnswer
+from app.app.serialization import Projection
+from app.app.pagination import encode_cursor, decode_cursor
+from app.app.csv_stream import read_answers_csv, iter_answers_csv, CSVFormatError
+from app.app.leaderboard import (
+    get_leaderboard_page,
+    etag_matches,
+    leaderboard_topic,
+    score_topic
 )
-from app.app.crud import (
+from app.app.pubsub import event_stream
+from app.app.scoring import get_cached_ground_truth, load_ground_truth, pack_answers, unpack_answers
+from app.app.crud_async import (
     create_answer_in_db,
-    get_all_answers_for_task_in_db,
+    get_user_rank_for_task_in_db,
     get_user_answers_for_task_in_db,
+    get_user_answer_data_from_db,
     get_task_from_db,
-    update_score_in_db
+    get_task_answer_from_db
 )
 
 router = APIRouter(
@@ -37,89 +42,61 @@ router = APIRouter(
     tags=['Answers']
 )
 
-field_names = (
-    'id',
-    'result'
-)
-
-validator = CSVValidator(field_names)
-
-validator.add_header_check('EX1', 'bad header')
-validator.add_record_length_check('EX2', 'unexpected record lenght')
-validator.add_record_check(check_csv_records)
-
-
-def calculate_score(db: Session, answer: Answer, task_id: int) -> None:
-    task = get_task_from_db(db=db, task_id=task_id)
-
-    function_name = task.function.name
-    correct_answers = [float(answer) for answer in task.task_ans.values()]
-    user_answers = [float(answer) for answer in answer.task_ans.values()]
+answer_projection = Projection(ReturnAnswer)
 
-    if function_name == 'MSE':
-        function = MSE(y_real=correct_answers, y_predicted=user_answers)
-    elif function_name == 'MAPE':
-        function = MAPE(y_real=correct_answers, y_predicted=user_answers)
-    elif function_name == 'MAE':
-        function = MAE(y_real=correct_answers, y_predicted=user_answers)
-    elif function_name == 'Accuracy':
-        function = Accuracy(y_real=correct_answers, y_predicted=user_answers)
-    elif function_name == 'Precision':
-        function = Precision(y_real=correct_answers, y_predicted=user_answers)
-    elif function_name == 'Recall':
-        function = Recall(y_real=correct_answers, y_predicted=user_answers)
-    elif function_name == 'F1Score':
-        function_name == F1Score(y_real=correct_answers, y_predicted=user_answers)
-    else:
-        raise ValueError('Metric name is not found')
 
-    score = function.calc()
-
-    update_score_in_db(db=db, answer_id=answer.id, score=score)
+def decode_answer_cursor(cursor: str):
+    try:
+        added_at, answer_id = decode_cursor(cursor)
+        return parse_date(added_at), int(answer_id)
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(detail='Cursor is not correct', status_code=400)
 
 
 @router.post('/{task_id}')
 async def create_answer(
         file: UploadFile,
         task_id: int,
-        background_tasks: BackgroundTasks,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         user_id: int = Depends(get_current_user_id_or_403),
 ):
-    task = get_task_from_db(db=db, task_id=task_id)
+    task = await get_task_from_db(db=db, task_id=task_id)
 
     if not task:
         raise HTTPException(detail='Task not found', status_code=404)
 
-    try:
-        csv_reader = csv.reader(StringIO(file.file.read().decode()), delimiter=',')
-        csv_data = list(csv_reader)
-        problems = validator.validate(csv_reader)
+    ground_truth = get_cached_ground_truth(task.id, task.ans_version)
 
-        if problems:
-            raise Exception
+    if ground_truth is None:
+        task_answer = await get_task_answer_from_db(db=db, task_id=task_id)
 
-    except Exception:
-        raise HTTPException(detail='CSV is not correct', status_code=400)
+        if not task_answer:
+            raise HTTPException(detail='Task answer is not uploaded', status_code=400)
 
-    task_ans = {}
+        ground_truth = load_ground_truth(task_id, task_answer.ans_version, task_answer.task_ans)
 
-    for row in csv_data[1:]:
-        id, result = row
-        task_ans[id] = result.strip()
+    try:
+        ids, values = await run_in_threadpool(read_answers_csv, file.file)
+    except CSVFormatError as e:
+        raise HTTPException(detail=f'CSV is not correct: {e}', status_code=400)
+    except UnicodeDecodeError:
+        raise HTTPException(detail='CSV is not correct', status_code=400)
+    finally:
+        file.file.close()
 
-    if len(task_ans) != len(task.task_ans):
+    if ids.size != ground_truth.ids.size:
         raise HTTPException(detail='CSV len is not correct', status_code=400)
 
-    answer = create_answer_in_db(
+    if not np.array_equal(ids, ground_truth.ids):
+        raise HTTPException(detail='CSV ids are not correct', status_code=400)
+
+    answer = await create_answer_in_db(
         db=db,
         task_id=task_id,
         user_id=user_id,
-        task_ans=task_ans
+        task_ans=pack_answers(ids, values)
     )
 
-    background_tasks.add_task(calculate_score, db=db, answer=answer, task_id=task_id)
-
     return JSONResponse(
         content={
             'answer_id': answer.id
@@ -131,28 +108,106 @@ async def create_answer(
 @router.get('/{task_id}/all')
 async def get_all_answers_for_task(
         task_id: int,
-        db: Session = Depends(get_db),
+        limit: int = Query(default=100, ge=1, le=1000),
+        offset: int = Query(default=0, ge=0),
+        if_none_match: Optional[str] = Header(default=None),
+        db: AsyncSession = Depends(get_async_db),
+):
+    page = await get_leaderboard_page(db=db, task_id=task_id, limit=limit, offset=offset)
+    headers = {
+        'ETag': page.etag,
+        'Cache-Control': 'no-cache'
+    }
+
+    if etag_matches(if_none_match, page.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=page.body, media_type='application/json', headers=headers)
+
+
+@router.get('/{task_id}/all/events')
+async def get_leaderboard_events(task_id: int):
+    return StreamingResponse(
+        event_stream(topic=leaderboard_topic(task_id), event='leaderboard'),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+
+@router.get('/{task_id}/events')
+async def get_user_score_events(
+        task_id: int,
+        user_id: int = Depends(get_stream_user_id_or_403)
 ):
-    answers = get_all_answers_for_task_in_db(db=db, task_id=task_id)
-    result = []
+    return StreamingResponse(
+        event_stream(topic=score_topic(task_id, user_id), event='score'),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
 
-    for answer in answers:
-        score, user_id, name, surname = answer
-        result.append({
+
+@router.get('/{task_id}/rank/{user_id}')
+async def get_user_rank_for_task(
+        task_id: int,
+        user_id: int,
+        db: AsyncSession = Depends(get_async_db),
+):
+    rank = await get_user_rank_for_task_in_db(db=db, task_id=task_id, user_id=user_id)
+
+    if not rank:
+        raise HTTPException(detail='Not found', status_code=404)
+
+    return JSONResponse(
+        content={
             'user_id': user_id,
-            'name': name,
-            'surname': surname,
-            'score': score
-        })
+            'rank': rank.rank,
+            'score': rank.score
+        },
+        status_code=200
+    )
+
+
+@router.get('/{task_id}/{answer_id}/csv')
+async def download_user_answer(
+        task_id: int,
+        answer_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        user_id: int = Depends(get_current_user_id_or_403)
+):
+    data = await get_user_answer_data_from_db(db=db, task_id=task_id, user_id=user_id, answer_id=answer_id)
+
+    if data is None:
+        raise HTTPException(detail='Not found', status_code=404)
 
-    return JSONResponse(content=sorted(result, key=lambda x: x['score']), status_code=200)
+    ids, values = unpack_answers(data)
+
+    return StreamingResponse(
+        iter_answers_csv(ids, values),
+        media_type='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="answer-{answer_id}.csv"'}
+    )
 
 
-@router.get('/{task_id}')
+@router.get('/{task_id}', response_model=list[ReturnAnswer])
 async def get_user_answers_for_task(
         task_id: int,
-        db: Session = Depends(get_db),
+        limit: int = Query(default=ANSWER_HISTORY_PAGE_SIZE, ge=1, le=ANSWER_HISTORY_MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        db: AsyncSession = Depends(get_async_db),
         user_id: int = Depends(get_current_user_id_or_403)
 ):
-    answers = get_user_answers_for_task_in_db(db=db, task_id=task_id, user_id=user_id)
-    return answers
+    answers = await get_user_answers_for_task_in_db(
+        db=db,
+        task_id=task_id,
+        user_id=user_id,
+        limit=limit,
+        after=decode_answer_cursor(cursor) if cursor else None
+    )
+
+    headers = {}
+
+    if len(answers) == limit:
+        last = answers[-1]
+        headers['X-Next-Cursor'] = encode_cursor(last.added_at, last.id)
+
+    return answer_projection.response(answers, headers=headers)
@@ -1,25 +1,25 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from starlette.requests import Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_sso.sso.google import GoogleSSO
 from oauthlib.oauth2.rfc6749.errors import InvalidGrantError
 
-from app.app.schemas import User, TokenBlacklist
-from app.app.crud import (
+from app.app.schemas import User
+from app.app.crud_async import (
     get_user,
     create_user,
     ban_token,
-    get_token,
     get_user_by_id
 )
-from app.app.dependencies import get_db
+from app.app.dependencies import get_async_db
 from app.app.utils import (
     create_access_token,
     create_refresh_token,
     get_current_user_id_or_403,
     get_refresh_token_or_403,
-    get_user_id_from_refresh_token
+    get_user_id_from_refresh_token,
+    get_revoked_token
 )
 from app.app.config import (
     DEBUG,
@@ -48,14 +48,14 @@ async def mail_sso_login():
 
 
 @router.get('/google/callback')
-async def google_sso_callback(request: Request, db: Session = Depends(get_db)):
+async def google_sso_callback(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         user = await sso.verify_and_process(request)
     except InvalidGrantError:
         raise HTTPException(detail='Bad request', status_code=400)
 
     provider_id = str(user.id)
-    db_user = get_user(db=db, provider_id=provider_id)
+    db_user = await get_user(db=db, provider_id=provider_id)
 
     if not db_user:
         name = user.first_name
@@ -67,7 +67,7 @@ async def google_sso_callback(request: Request, db: Session = Depends(get_db)):
         if not surname:
             surname = ''
 
-        db_user = create_user(
+        db_user = await create_user(
             db=db,
             user=User(
                 provider_id=provider_id,
@@ -102,37 +102,24 @@ async def google_sso_callback(request: Request, db: Session = Depends(get_db)):
 
 @router.post('/logout')
 async def logout(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         _: int = Depends(get_current_user_id_or_403),
         refresh_token: str = Depends(get_refresh_token_or_403)
 ):
-    ban_token(
-        db=db,
-        token=TokenBlacklist(
-            token=refresh_token
-        )
-    )
+    await ban_token(db=db, token=get_revoked_token(refresh_token))
     return JSONResponse(content={'result': 'OK'}, status_code=200)
 
 
 @router.post('/refresh')
 async def refresh(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         refresh_token: str = Depends(get_refresh_token_or_403)
 ):
-    db_token = get_token(db=db, token=refresh_token)
-    if db_token:
+    if not await ban_token(db=db, token=get_revoked_token(refresh_token)):
         raise HTTPException(status_code=403, detail='Unauthorized')
 
-    ban_token(
-        db=db,
-        token=TokenBlacklist(
-            token=refresh_token
-        )
-    )
-
     user_id = get_user_id_from_refresh_token(refresh_token)
-    db_user = get_user_by_id(db=db, user_id=user_id)
+    db_user = await get_user_by_id(db=db, user_id=user_id)
 
     response = JSONResponse(
         content={
@@ -1,20 +1,23 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.app.dependencies import get_db
+from app.app.dependencies import get_async_db
 from app.app.utils import get_superadmin_or_404
 from app.app.schemas import Function
-from app.app.crud import get_all_functions
+from app.app.crud_async import get_all_functions
+from app.app.serialization import Projection
 
 router = APIRouter(
     prefix='/functions',
     tags=['Functions']
 )
 
+function_projection = Projection(Function)
+
 
 @router.get('/', response_model=list[Function])
 async def get_functions(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         _: bool = Depends(get_superadmin_or_404)
 ):
-    return get_all_functions(db=db)
+    return function_projection.response(await get_all_functions(db=db))
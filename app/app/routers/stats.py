@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from app.app.queries import get_query_stats, reset_query_stats
+from app.app.utils import get_superadmin_or_404
+
+router = APIRouter(
+    prefix='/stats',
+    tags=['Stats']
+)
+
+
+@router.get('/queries')
+async def get_queries_stats(
+        _: bool = Depends(get_superadmin_or_404)
+):
+    return get_query_stats()
+
+
+@router.delete('/queries')
+async def reset_queries_stats(
+        _: bool = Depends(get_superadmin_or_404)
+):
+    reset_query_stats()
+    return JSONResponse(content={'result': 'OK'}, status_code=200)
@@ -1,106 +1,145 @@
-import csv
-from io import StringIO
-import uuid
 from fastapi import (
     APIRouter,
     HTTPException,
     Depends,
+    Query,
     UploadFile
 )
+from fastapi.concurrency import run_in_threadpool
 from starlette.requests import Request
-from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse
+from botocore.client import BaseClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import JSONResponse, ORJSONResponse
+from botocore.exceptions import ClientError
 from pydantic import ValidationError
-from typing import Optional
-
-from app.app.dependencies import get_db, get_s3
-from app.app.schemas import CreateTask, EditTask, ReturnTask
-from app.app.utils import get_superadmin_or_404
-from app.app.crud import (
+from typing import List, Optional
+
+from app.app.dependencies import get_async_db, get_s3
+from app.app.config import TASK_SEARCH_PAGE_SIZE, TASK_SEARCH_MAX_PAGE_SIZE
+from app.app.schemas import (
+    CreateTask,
+    EditTask,
+    ReturnTask,
+    ParticipantTask,
+    ReturnRescoreJob,
+    InitiateUpload,
+    CompleteUpload
+)
+from app.app.utils import get_superadmin_or_404, parse_date
+from app.app.crud_async import (
     create_task_in_db,
-    add_task_data_in_db,
     get_task_from_db,
     update_task_in_db,
-    update_task_data_in_db,
+    set_task_data_in_db,
+    set_test_data_in_db,
+    set_task_answer_in_db,
     search_tasks_by_name_in_db,
     change_task_status_in_db,
     get_user_by_id,
     get_all_tasks_for_user_id_db,
-    add_task_answer_in_db,
-    update_task_answer_in_db,
-    add_test_data_in_db,
-    update_test_data_in_db
+    create_rescore_job_in_db,
+    get_rescore_job_from_db
+)
+from app.app.pagination import encode_cursor, decode_cursor
+from app.app.serialization import Projection
+from app.app.csv_stream import read_answers_csv, CSVFormatError
+from app.app.scoring import invalidate_ground_truth, pack_answers
+from app.app.storage import (
+    presign_task_data,
+    upload_dataset,
+    upload_key_prefix,
+    initiate_upload,
+    complete_upload,
+    abort_upload,
+    delete_object,
+    upload_parts_are_valid,
+    UploadTooLargeError
 )
-from app.app.config import S3_BUCKET_NAME
 
 router = APIRouter(
     prefix='/tasks',
     tags=['Tasks']
 )
 
+task_projection = Projection(ReturnTask)
+participant_task_projection = Projection(ParticipantTask, exclude=('best_score', 'submissions'))
+
+UPLOAD_RECORDERS = {
+    'task_data': set_task_data_in_db,
+    'test_data': set_test_data_in_db
+}
+
+
+async def upload_task_file(db: AsyncSession, s3: BaseClient, file: UploadFile, task_id: int, recorder) -> None:
+    try:
+        if not await get_task_from_db(db=db, task_id=task_id):
+            raise HTTPException(detail='Task not found', status_code=404)
+
+        uid = await upload_dataset(s3, file.file)
+        recorded = await recorder(db=db, task_id=task_id, uid=uid)
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=500, detail='Error on uploading the file')
+    finally:
+        file.file.close()
+
+    if not recorded:
+        raise HTTPException(detail='Task not found', status_code=404)
+
+
+def decode_task_cursor(cursor: str):
+    try:
+        is_active, end_date, task_id = decode_cursor(cursor)
+        return bool(is_active), None if end_date is None else parse_date(end_date), int(task_id)
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(detail='Cursor is not correct', status_code=400)
+
 
 @router.get('/search', response_model=list[ReturnTask])
 async def search_tasks(
-        db: Session = Depends(get_db),
-        s3: Session = Depends(get_s3),
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3),
         name: Optional[str] = None,
         end_date: Optional[str] = None,
-        tag: Optional[str] = None
+        tag: Optional[List[str]] = Query(default=None),
+        limit: int = Query(default=TASK_SEARCH_PAGE_SIZE, ge=1, le=TASK_SEARCH_MAX_PAGE_SIZE),
+        cursor: Optional[str] = None
 ):
-    tasks = search_tasks_by_name_in_db(
+    tasks = await search_tasks_by_name_in_db(
         db=db,
+        limit=limit,
         name=name,
         end_date=end_date,
-        tag=tag
+        tags=tag,
+        after=decode_task_cursor(cursor) if cursor else None
     )
 
-    for task in tasks:
-        task_data = task.task_data
-        test_data = task.test_data
-
-        if task_data:
-            task.task_data = s3.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': S3_BUCKET_NAME,
-                    'Key': task_data
-                },
-                ExpiresIn=1800
-            )
-
-        if test_data:
-            task.test_data = s3.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': S3_BUCKET_NAME,
-                    'Key': test_data
-                },
-                ExpiresIn=1800
-            )
-
-    return tasks
+    headers = {}
+
+    if len(tasks) == limit:
+        last = tasks[-1]
+        headers['X-Next-Cursor'] = encode_cursor(last.is_active is True, last.end_date, last.id)
+
+    return task_projection.response(await presign_task_data(s3, tasks), headers=headers)
 
 
 @router.patch('/{task_id}/status')
 async def change_task_status(
         task_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         _: bool = Depends(get_superadmin_or_404),
 ):
-    task = get_task_from_db(db=db, task_id=task_id)
-
-    if not task:
+    if not await change_task_status_in_db(db=db, task_id=task_id):
         raise HTTPException(detail='Not found', status_code=404)
 
-    change_task_status_in_db(db=db, task_id=task_id)
-
     return JSONResponse(content='Updated', status_code=200)
 
 
 @router.post('/create')
 async def create_task(
         request: Request,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         _: bool = Depends(get_superadmin_or_404)
 ):
     request_data = await request.json()
@@ -110,7 +149,7 @@ async def create_task(
     except ValidationError:
         raise HTTPException(detail='Request data is not valid', status_code=400)
 
-    task = create_task_in_db(db=db, data=validated_request_data.model_dump())
+    task = await create_task_in_db(db=db, data=validated_request_data.model_dump())
 
     return JSONResponse(
         content={
@@ -124,121 +163,144 @@ async def create_task(
 async def add_task_data(
         file: UploadFile,
         task_id: int,
-        db: Session = Depends(get_db),
-        s3: Session = Depends(get_s3),
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3),
         _: bool = Depends(get_superadmin_or_404),
 ):
-    try:
-        file.file.read()
-        file.file.seek(0)
-        uid = str(uuid.uuid4())
-        s3.upload_fileobj(file.file, S3_BUCKET_NAME, uid)
-        add_task_data_in_db(db=db, task_id=task_id, uid=uid)
-        return JSONResponse(content={'result': 'OK'}, status_code=201)
-    except Exception:
-        raise HTTPException(status_code=500, detail='Error on uploading the file')
-    finally:
-        file.file.close()
+    await upload_task_file(db=db, s3=s3, file=file, task_id=task_id, recorder=set_task_data_in_db)
+    return JSONResponse(content={'result': 'OK'}, status_code=201)
 
 
 @router.post('/{task_id}/add_test_data')
 async def add_test_data(
         file: UploadFile,
         task_id: int,
-        db: Session = Depends(get_db),
-        s3: Session = Depends(get_s3),
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3),
+        _: bool = Depends(get_superadmin_or_404),
+):
+    await upload_task_file(db=db, s3=s3, file=file, task_id=task_id, recorder=set_test_data_in_db)
+    return JSONResponse(content={'result': 'OK'}, status_code=201)
+
+
+@router.post('/{task_id}/uploads')
+async def initiate_task_upload(
+        task_id: int,
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3),
         _: bool = Depends(get_superadmin_or_404),
 ):
     try:
-        file.file.read()
-        file.file.seek(0)
-        uid = str(uuid.uuid4())
-        s3.upload_fileobj(file.file, S3_BUCKET_NAME, uid)
-        add_test_data_in_db(db=db, task_id=task_id, uid=uid)
-        return JSONResponse(content={'result': 'OK'}, status_code=201)
-    except Exception:
-        raise HTTPException(status_code=500, detail='Error on uploading the file')
-    finally:
-        file.file.close()
+        validated_request_data = InitiateUpload(**await request.json())
+    except ValidationError:
+        raise HTTPException(detail='Request data is not valid', status_code=400)
 
+    parts = validated_request_data.parts
 
-@router.post('/{task_id}/add_answer')
-async def add_task_answer(
-        file: UploadFile,
+    if parts is not None and not upload_parts_are_valid(parts, validated_request_data.size):
+        raise HTTPException(detail='Upload size or parts count is not correct', status_code=400)
+
+    task = await get_task_from_db(db=db, task_id=task_id)
+
+    if not task:
+        raise HTTPException(detail='Task not found', status_code=404)
+
+    upload = await initiate_upload(s3, task_id=task_id, parts=parts)
+    return JSONResponse(content=upload, status_code=201)
+
+
+@router.post('/{task_id}/uploads/complete')
+async def complete_task_upload(
         task_id: int,
-        db: Session = Depends(get_db),
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3),
         _: bool = Depends(get_superadmin_or_404),
 ):
-    task = get_task_from_db(db=db, task_id=task_id)
+    try:
+        validated_request_data = CompleteUpload(**await request.json())
+    except ValidationError:
+        raise HTTPException(detail='Request data is not valid', status_code=400)
+
+    key = validated_request_data.key
+
+    if not key.startswith(upload_key_prefix(task_id)):
+        raise HTTPException(detail='Upload key is not correct', status_code=400)
+
+    task = await get_task_from_db(db=db, task_id=task_id)
 
     if not task:
+        if validated_request_data.upload_id:
+            await abort_upload(s3, key=key, upload_id=validated_request_data.upload_id)
+
         raise HTTPException(detail='Task not found', status_code=404)
 
     try:
-        csv_reader = csv.reader(StringIO(file.file.read().decode()), delimiter=',')
-        csv_data = list(csv_reader)
-    except Exception:
-        raise HTTPException(detail='CSV is not correct', status_code=400)
+        await complete_upload(
+            s3,
+            key=key,
+            upload_id=validated_request_data.upload_id,
+            parts=[part.model_dump() for part in validated_request_data.parts or []]
+        )
+    except UploadTooLargeError:
+        raise HTTPException(detail='Upload is too large', status_code=413)
+    except (ClientError, FileNotFoundError):
+        raise HTTPException(detail='Upload is not completed', status_code=400)
 
-    task_ans = {}
+    if not await UPLOAD_RECORDERS[validated_request_data.kind](db=db, task_id=task_id, uid=key):
+        await delete_object(s3, key)
+        raise HTTPException(detail='Task not found', status_code=404)
 
-    for row in csv_data[1:]:
-        id, result = row
-        task_ans[id] = result.strip()
+    return JSONResponse(content={'result': 'OK'}, status_code=201)
+
+
+@router.post('/{task_id}/add_answer')
+async def add_task_answer(
+        file: UploadFile,
+        task_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        _: bool = Depends(get_superadmin_or_404),
+):
+    try:
+        ids, values = await run_in_threadpool(read_answers_csv, file.file)
+    except CSVFormatError as e:
+        raise HTTPException(detail=f'CSV is not correct: {e}', status_code=400)
+    except UnicodeDecodeError:
+        raise HTTPException(detail='CSV is not correct', status_code=400)
+    finally:
+        file.file.close()
+
+    if not await set_task_answer_in_db(db=db, task_id=task_id, task_ans=pack_answers(ids, values)):
+        raise HTTPException(detail='Task not found', status_code=404)
 
-    add_task_answer_in_db(db=db, task_id=task_id, task_ans=task_ans)
+    invalidate_ground_truth(task_id)
+    await create_rescore_job_in_db(db=db, task_id=task_id)
     return JSONResponse(content={'result': 'OK'}, status_code=201)
 
 
 @router.get('/{task_id}', response_model=ReturnTask)
 async def get_task(
         task_id: int,
-        db: Session = Depends(get_db),
-        s3: Session = Depends(get_s3)
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3)
 ):
-    task = get_task_from_db(db=db, task_id=task_id)
+    task = await get_task_from_db(db=db, task_id=task_id)
 
     if not task:
         raise HTTPException(detail='Not found', status_code=404)
 
-    task_data = task.task_data
-    test_data = task.test_data
-
-    if task_data:
-        task.task_data = s3.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': S3_BUCKET_NAME,
-                'Key': task_data
-            },
-            ExpiresIn=1800
-        )
-
-    if test_data:
-        task.test_data = s3.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': S3_BUCKET_NAME,
-                'Key': test_data
-            },
-            ExpiresIn=1800
-        )
-
-    return task
+    await presign_task_data(s3, [task])
+    return ORJSONResponse(content=task_projection.row(task))
 
 
 @router.patch('/{task_id}/update')
 async def update_task(
         task_id: int,
         request: Request,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         _: bool = Depends(get_superadmin_or_404),
 ):
-    task = get_task_from_db(db=db, task_id=task_id)
-
-    if not task:
-        raise HTTPException(detail='Not found', status_code=404)
-
     request_data = await request.json()
     try:
         validated_request_data = EditTask(**request_data)
@@ -246,7 +308,9 @@ async def update_task(
         raise HTTPException(detail='Request data is not valid', status_code=400)
 
     fields_to_update = validated_request_data.model_dump(exclude_unset=True)
-    update_task_in_db(db=db, task_id=task_id, fields_to_update=fields_to_update)
+
+    if not await update_task_in_db(db=db, task_id=task_id, fields_to_update=fields_to_update):
+        raise HTTPException(detail='Not found', status_code=404)
 
     return JSONResponse(content='Updated', status_code=200)
 
@@ -255,107 +319,94 @@ async def update_task(
 async def update_task_data(
         task_id: int,
         file: UploadFile,
-        db: Session = Depends(get_db),
-        s3: Session = Depends(get_s3),
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3),
         _: bool = Depends(get_superadmin_or_404),
 ):
-    try:
-        file.file.read()
-        file.file.seek(0)
-        uid = str(uuid.uuid4())
-        s3.upload_fileobj(file.file, S3_BUCKET_NAME, uid)
-        update_task_data_in_db(db=db, task_id=task_id, uid=uid)
-        return JSONResponse(content='Updated', status_code=200)
-    except Exception:
-        raise HTTPException(status_code=500, detail='Error on uploading the file')
-    finally:
-        file.file.close()
+    await upload_task_file(db=db, s3=s3, file=file, task_id=task_id, recorder=set_task_data_in_db)
+    return JSONResponse(content='Updated', status_code=200)
 
 
 @router.patch('/{task_id}/update_test_data')
 async def update_test_data(
         task_id: int,
         file: UploadFile,
-        db: Session = Depends(get_db),
-        s3: Session = Depends(get_s3),
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3),
         _: bool = Depends(get_superadmin_or_404),
 ):
-    try:
-        file.file.read()
-        file.file.seek(0)
-        uid = str(uuid.uuid4())
-        s3.upload_fileobj(file.file, S3_BUCKET_NAME, uid)
-        update_test_data_in_db(db=db, task_id=task_id, uid=uid)
-        return JSONResponse(content='Updated', status_code=200)
-    except Exception:
-        raise HTTPException(status_code=500, detail='Error on uploading the file')
-    finally:
-        file.file.close()
+    await upload_task_file(db=db, s3=s3, file=file, task_id=task_id, recorder=set_test_data_in_db)
+    return JSONResponse(content='Updated', status_code=200)
 
 
 @router.patch('/{task_id}/update_answer')
 async def update_task_answer(
         file: UploadFile,
         task_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         _: bool = Depends(get_superadmin_or_404),
 ):
-    task = get_task_from_db(db=db, task_id=task_id)
-
-    if not task:
-        raise HTTPException(detail='Task not found', status_code=404)
-
     try:
-        csv_reader = csv.reader(StringIO(file.file.read().decode()), delimiter=',')
-        csv_data = list(csv_reader)
-    except Exception:
+        ids, values = await run_in_threadpool(read_answers_csv, file.file)
+    except CSVFormatError as e:
+        raise HTTPException(detail=f'CSV is not correct: {e}', status_code=400)
+    except UnicodeDecodeError:
         raise HTTPException(detail='CSV is not correct', status_code=400)
+    finally:
+        file.file.close()
 
-    task_ans = {}
-
-    for row in csv_data[1:]:
-        id, result = row
-        task_ans[id] = result.strip()
+    if not await set_task_answer_in_db(db=db, task_id=task_id, task_ans=pack_answers(ids, values)):
+        raise HTTPException(detail='Task not found', status_code=404)
 
-    update_task_answer_in_db(db=db, task_id=task_id, task_ans=task_ans)
+    invalidate_ground_truth(task_id)
+    await create_rescore_job_in_db(db=db, task_id=task_id)
     return JSONResponse(content='Updated', status_code=200)
 
 
-@router.get('/participant/{user_id}', response_model=list[ReturnTask])
+@router.get('/participant/{user_id}', response_model=list[ParticipantTask])
 async def get_all_tasks_for_user(
         user_id: int,
-        db: Session = Depends(get_db),
-        s3: Session = Depends(get_s3)
+        db: AsyncSession = Depends(get_async_db),
+        s3: BaseClient = Depends(get_s3)
 ):
-    user = get_user_by_id(db=db, user_id=user_id)
+    user = await get_user_by_id(db=db, user_id=user_id)
 
     if not user:
         raise HTTPException(detail='User not found', status_code=404)
 
-    tasks = get_all_tasks_for_user_id_db(db=db, user_id=user_id)
-
-    for task in tasks:
-        task_data = task.task_data
-        test_data = task.test_data
-
-        if task_data:
-            task.task_data = s3.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': S3_BUCKET_NAME,
-                    'Key': task_data
-                },
-                ExpiresIn=1800
-            )
-
-        if test_data:
-            task.test_data = s3.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': S3_BUCKET_NAME,
-                    'Key': test_data
-                },
-                ExpiresIn=1800
-            )
-
-    return tasks
+    rows = await get_all_tasks_for_user_id_db(db=db, user_id=user_id)
+    await presign_task_data(s3, [row.Task for row in rows])
+
+    return ORJSONResponse(content=[
+        participant_task_projection.row(row.Task, best_score=row.best_score, submissions=row.submissions)
+        for row in rows
+    ])
+
+
+@router.post('/{task_id}/rescore')
+async def rescore_task(
+        task_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        _: bool = Depends(get_superadmin_or_404),
+):
+    job_id = await create_rescore_job_in_db(db=db, task_id=task_id)
+
+    if job_id is None:
+        raise HTTPException(detail='Task not found', status_code=404)
+
+    return JSONResponse(content={'job_id': job_id}, status_code=202)
+
+
+@router.get('/{task_id}/rescore/{job_id}', response_model=ReturnRescoreJob)
+async def get_rescore_job(
+        task_id: int,
+        job_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        _: bool = Depends(get_superadmin_or_404),
+):
+    job = await get_rescore_job_from_db(db=db, job_id=job_id)
+
+    if not job or job.task_id != task_id:
+        raise HTTPException(detail='Not found', status_code=404)
+
+    return job
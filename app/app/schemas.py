@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel
 
 
@@ -23,7 +23,8 @@ class ReturnUser(User):
 
 class TokenBlacklist(BaseModel):
 
-    token: str
+    token_digest: bytes
+    expires_at: datetime
 
 
 class EditUser(BaseModel):
@@ -78,3 +79,52 @@ class ReturnTask(BaseModel):
     ans_type: str
     tags: Optional[List[str]]
     is_active: bool
+
+
+class ParticipantTask(ReturnTask):
+
+    best_score: Optional[float]
+    submissions: int
+
+
+class ReturnRescoreJob(BaseModel):
+
+    id: int
+    task_id: int
+    status: str
+    total: Optional[int]
+    processed: int
+    error: Optional[str]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+class ReturnAnswer(BaseModel):
+
+    id: int
+    score: Optional[float]
+    added_at: datetime
+    is_active: bool
+
+
+class InitiateUpload(BaseModel):
+
+    kind: Literal['task_data', 'test_data']
+    parts: Optional[int] = None
+    size: Optional[int] = None
+
+
+class UploadPart(BaseModel):
+
+    part_number: int
+    etag: str
+
+
+class CompleteUpload(BaseModel):
+
+    kind: Literal['task_data', 'test_data']
+    key: str
+    upload_id: Optional[str] = None
+    parts: Optional[List[UploadPart]] = None
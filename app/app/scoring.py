@@ -0,0 +1,94 @@
+import math
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .cache import LRUCache
+from .config import GROUND_TRUTH_CACHE_SIZE
+from .metrics import calculate_metric
+from .models import Task
+
+
+class GroundTruth(NamedTuple):
+
+    version: int
+    ids: np.ndarray
+    values: np.ndarray
+
+
+ID_DTYPE = np.dtype('<i8')
+VALUE_DTYPE = np.dtype('<f8')
+
+ground_truth_cache = LRUCache(maxsize=GROUND_TRUTH_CACHE_SIZE)
+
+
+def pack_answers(ids: np.ndarray, values: np.ndarray) -> bytes:
+    return ids.astype(ID_DTYPE, copy=False).tobytes() + values.astype(VALUE_DTYPE, copy=False).tobytes()
+
+
+def unpack_answers(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    size = len(data) // (ID_DTYPE.itemsize + VALUE_DTYPE.itemsize)
+    ids = np.frombuffer(data, dtype=ID_DTYPE, count=size)
+    values = np.frombuffer(data, dtype=VALUE_DTYPE, count=size, offset=size * ID_DTYPE.itemsize)
+    return ids, values
+
+
+def get_cached_ground_truth(task_id: int, ans_version: int) -> Optional[GroundTruth]:
+    ground_truth = ground_truth_cache.get(task_id)
+
+    if ground_truth is not None and ground_truth.version == ans_version:
+        return ground_truth
+
+    return None
+
+
+def load_ground_truth(task_id: int, ans_version: int, task_ans: bytes) -> GroundTruth:
+    ids, values = unpack_answers(task_ans)
+    ground_truth = GroundTruth(version=ans_version, ids=ids, values=values)
+    ground_truth_cache.set(task_id, ground_truth)
+    return ground_truth
+
+
+def get_ground_truth(task: Task) -> GroundTruth:
+    ground_truth = get_cached_ground_truth(task.id, task.ans_version)
+
+    if ground_truth is None:
+        if task.task_ans is None:
+            raise ValueError('Task answer is not uploaded')
+
+        ground_truth = load_ground_truth(task.id, task.ans_version, task.task_ans)
+
+    return ground_truth
+
+
+def invalidate_ground_truth(task_id: int) -> None:
+    ground_truth_cache.pop(task_id)
+
+
+def align_answers(ground_truth: GroundTruth, ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    if not np.array_equal(ids, ground_truth.ids):
+        raise ValueError('Answer ids do not match task ids')
+
+    return values
+
+
+def score_answers(
+        metric_name: str,
+        ground_truth: GroundTruth,
+        answers: Iterable[Tuple[int, bytes]]
+) -> List[Tuple[int, Optional[float]]]:
+    scores = []
+
+    for answer_id, data in answers:
+        try:
+            ids, values = unpack_answers(data)
+            score = calculate_metric(metric_name, ground_truth.values, align_answers(ground_truth, ids=ids, values=values))
+        except (ValueError, TypeError):
+            score = None
+
+        if score is not None and not math.isfinite(score):
+            score = None
+
+        scores.append((answer_id, score))
+
+    return scores
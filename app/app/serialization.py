@@ -0,0 +1,35 @@
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+class Projection:
+
+    def __init__(self, model: Type[BaseModel], exclude: Iterable[str] = ()) -> None:
+        self.fields = tuple(field for field in model.model_fields if field not in exclude)
+        self._getter = attrgetter(*self.fields)
+
+    def row(self, obj: Any, **extra: Any) -> Dict[str, Any]:
+        values = self._getter(obj)
+        row = dict(zip(self.fields, values if len(self.fields) > 1 else (values,)))
+        row.update(extra)
+        return row
+
+    def rows(self, objs: Iterable[Any]) -> List[Dict[str, Any]]:
+        fields = self.fields
+        getter = self._getter
+
+        if len(fields) == 1:
+            return [{fields[0]: getter(obj)} for obj in objs]
+
+        return [dict(zip(fields, getter(obj))) for obj in objs]
+
+    def response(
+            self,
+            objs: Iterable[Any],
+            status_code: int = 200,
+            headers: Optional[Dict[str, str]] = None
+    ) -> ORJSONResponse:
+        return ORJSONResponse(content=self.rows(objs), status_code=status_code, headers=headers)
@@ -1,10 +1,58 @@
 SCOREBOARD_SQL = (
-    'SELECT score, user_id, "user".name AS name, "user".surname AS surname FROM "user" '
-    'JOIN (SELECT MAX(answer.score) AS score, answer.user_id FROM answer '
-    'WHERE answer.task_id = %(task_id)s AND answer.score IS NOT NULL AND answer.is_active = TRUE '
-    'GROUP BY answer.user_id ORDER BY score DESC) scores ON "user".id = scores.user_id'
+    'SELECT leaderboard.score, leaderboard.user_id, "user".name AS name, "user".surname AS surname '
+    'FROM leaderboard JOIN "user" ON "user".id = leaderboard.user_id '
+    'WHERE leaderboard.task_id = :task_id '
+    'ORDER BY leaderboard.rank_score DESC, leaderboard.answer_id '
+    'LIMIT :limit OFFSET :offset'
 )
 
-DISTINCT_TASKS_SQL = (
-    'SELECT DISTINCT answer.task_id FROM answer WHERE answer.user_id = %(user_id)s'
+USER_RANK_SQL = (
+    'SELECT own.score, 1 + (SELECT COUNT(*) FROM leaderboard better '
+    'WHERE better.task_id = own.task_id AND (better.rank_score > own.rank_score '
+    'OR (better.rank_score = own.rank_score AND better.answer_id < own.answer_id))) AS rank '
+    'FROM leaderboard own WHERE own.task_id = :task_id AND own.user_id = :user_id'
+)
+
+LEADERBOARD_UPSERT_SQL = (
+    'INSERT INTO leaderboard (task_id, user_id, answer_id, score, rank_score, updated_at) '
+    'SELECT answer.task_id, answer.user_id, answer.id, answer.score, :rank_score, now() FROM answer '
+    'WHERE answer.id = :answer_id AND answer.score IS NOT NULL AND answer.is_active = TRUE '
+    'ON CONFLICT (task_id, user_id) DO UPDATE SET '
+    'answer_id = EXCLUDED.answer_id, score = EXCLUDED.score, '
+    'rank_score = EXCLUDED.rank_score, updated_at = EXCLUDED.updated_at '
+    'WHERE EXCLUDED.rank_score > leaderboard.rank_score '
+    'RETURNING leaderboard.task_id, leaderboard.user_id, leaderboard.score'
+)
+
+LEADERBOARD_LOCK_SQL = (
+    'SELECT pg_advisory_xact_lock(hashtext(\'leaderboard\'), :task_id)'
+)
+
+LEADERBOARD_REBUILD_SQL = (
+    'INSERT INTO leaderboard (task_id, user_id, answer_id, score, rank_score, updated_at) '
+    'SELECT DISTINCT ON (answer.user_id) answer.task_id, answer.user_id, answer.id, answer.score, '
+    ':sign * answer.score AS rank_score, now() FROM answer '
+    'WHERE answer.task_id = :task_id AND answer.score IS NOT NULL AND answer.is_active IS TRUE '
+    'ORDER BY answer.user_id, rank_score DESC, answer.id'
+)
+
+RESCORE_ENQUEUE_SQL = (
+    'WITH pending AS ('
+    "SELECT id FROM rescore_job WHERE task_id = :task_id AND status = 'pending' LIMIT 1"
+    '), inserted AS ('
+    'INSERT INTO rescore_job (task_id, status, attempts, processed, created_at) '
+    "SELECT task.id, 'pending', 0, 0, now() FROM task "
+    'WHERE task.id = :task_id AND NOT EXISTS (SELECT 1 FROM pending) '
+    'RETURNING id'
+    ') SELECT id FROM inserted UNION ALL SELECT id FROM pending'
+)
+
+BAN_TOKEN_SQL = (
+    'INSERT INTO token_blacklist (token_digest, expires_at) VALUES (:token_digest, :expires_at) '
+    'ON CONFLICT (token_digest) DO NOTHING '
+    'RETURNING id'
+)
+
+NOTIFY_SQL = (
+    'SELECT pg_notify(:channel, :payload)'
 )
@@ -0,0 +1,241 @@
+import hashlib
+import uuid
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
+
+from boto3.s3.transfer import TransferConfig
+from botocore.client import BaseClient
+from botocore.exceptions import ClientError
+from fastapi.concurrency import run_in_threadpool
+
+from .cache import LRUCache
+from .models import Task
+from .config import (
+    S3_BUCKET_NAME,
+    PRESIGNED_URL_EXPIRES,
+    PRESIGNED_URL_CACHE_TTL,
+    PRESIGNED_URL_CACHE_SIZE,
+    S3_MULTIPART_THRESHOLD,
+    S3_MULTIPART_CHUNK_SIZE,
+    S3_MAX_CONCURRENCY,
+    UPLOAD_URL_EXPIRES,
+    UPLOAD_MAX_SIZE,
+    UPLOAD_MAX_PARTS,
+    UPLOAD_MIN_PART_SIZE
+)
+
+DATASET_KEY_PREFIX = 'datasets/'
+UPLOAD_KEY_PREFIX = 'uploads/'
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+presigned_url_cache = LRUCache(maxsize=PRESIGNED_URL_CACHE_SIZE, ttl=PRESIGNED_URL_CACHE_TTL)
+
+transfer_config = TransferConfig(
+    multipart_threshold=S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=S3_MULTIPART_CHUNK_SIZE,
+    max_concurrency=S3_MAX_CONCURRENCY
+)
+
+
+def sign_keys(s3: BaseClient, keys: Iterable[str]) -> Dict[str, str]:
+    urls = {}
+
+    for key in keys:
+        urls[key] = s3.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': S3_BUCKET_NAME,
+                'Key': key
+            },
+            ExpiresIn=PRESIGNED_URL_EXPIRES
+        )
+        presigned_url_cache.set(key, urls[key])
+
+    return urls
+
+
+async def get_presigned_urls(s3: BaseClient, keys: Iterable[str]) -> Dict[str, str]:
+    urls = {}
+    missing = []
+
+    for key in set(keys):
+        url = presigned_url_cache.get(key)
+
+        if url is None:
+            missing.append(key)
+        else:
+            urls[key] = url
+
+    if missing:
+        urls.update(await run_in_threadpool(sign_keys, s3, missing))
+
+    return urls
+
+
+async def presign_task_data(s3: BaseClient, tasks: List[Task]) -> List[Task]:
+    urls = await get_presigned_urls(
+        s3,
+        (key for task in tasks for key in (task.task_data, task.test_data) if key)
+    )
+
+    for task in tasks:
+        if task.task_data:
+            task.task_data = urls[task.task_data]
+
+        if task.test_data:
+            task.test_data = urls[task.test_data]
+
+    return tasks
+
+
+def hash_file(file: BinaryIO) -> str:
+    digest = hashlib.sha256()
+
+    while chunk := file.read(S3_MULTIPART_CHUNK_SIZE):
+        digest.update(chunk)
+
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def object_size(s3: BaseClient, key: str) -> Optional[int]:
+    try:
+        return s3.head_object(Bucket=S3_BUCKET_NAME, Key=key)['ContentLength']
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+
+
+def object_exists(s3: BaseClient, key: str) -> bool:
+    return object_size(s3, key) is not None
+
+
+def upload_dataset_sync(s3: BaseClient, file: BinaryIO) -> str:
+    digest = hash_file(file)
+    key = f'{DATASET_KEY_PREFIX}{digest}'
+
+    if not object_exists(s3, key):
+        s3.upload_fileobj(
+            file,
+            S3_BUCKET_NAME,
+            key,
+            ExtraArgs={'Metadata': {'sha256': digest}},
+            Config=transfer_config
+        )
+
+    return key
+
+
+async def upload_dataset(s3: BaseClient, file: BinaryIO) -> str:
+    return await run_in_threadpool(upload_dataset_sync, s3, file)
+
+
+def upload_key_prefix(task_id: int) -> str:
+    return f'{UPLOAD_KEY_PREFIX}{task_id}/'
+
+
+def upload_parts_are_valid(parts: int, size: Optional[int]) -> bool:
+    return (
+        size is not None
+        and 0 < size <= UPLOAD_MAX_SIZE
+        and 1 <= parts <= UPLOAD_MAX_PARTS
+        and (parts - 1) * UPLOAD_MIN_PART_SIZE < size
+    )
+
+
+def abort_upload_sync(s3: BaseClient, key: str, upload_id: str) -> None:
+    try:
+        s3.abort_multipart_upload(Bucket=S3_BUCKET_NAME, Key=key, UploadId=upload_id)
+    except ClientError:
+        pass
+
+
+def delete_object_sync(s3: BaseClient, key: str) -> None:
+    s3.delete_object(Bucket=S3_BUCKET_NAME, Key=key)
+
+
+def initiate_upload_sync(s3: BaseClient, task_id: int, parts: Optional[int] = None) -> Dict[str, Any]:
+    key = f'{upload_key_prefix(task_id)}{uuid.uuid4()}'
+
+    if not parts:
+        post = s3.generate_presigned_post(
+            Bucket=S3_BUCKET_NAME,
+            Key=key,
+            Conditions=[['content-length-range', 1, UPLOAD_MAX_SIZE]],
+            ExpiresIn=UPLOAD_URL_EXPIRES
+        )
+        return {'key': key, 'url': post['url'], 'fields': post['fields']}
+
+    upload_id = s3.create_multipart_upload(Bucket=S3_BUCKET_NAME, Key=key)['UploadId']
+    part_urls = [
+        s3.generate_presigned_url(
+            'upload_part',
+            Params={
+                'Bucket': S3_BUCKET_NAME,
+                'Key': key,
+                'UploadId': upload_id,
+                'PartNumber': part_number
+            },
+            ExpiresIn=UPLOAD_URL_EXPIRES
+        )
+        for part_number in range(1, parts + 1)
+    ]
+    return {'key': key, 'upload_id': upload_id, 'part_urls': part_urls}
+
+
+def complete_upload_sync(
+        s3: BaseClient,
+        key: str,
+        upload_id: Optional[str] = None,
+        parts: Optional[List[Dict[str, Any]]] = None
+) -> None:
+    if upload_id:
+        try:
+            s3.complete_multipart_upload(
+                Bucket=S3_BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    'Parts': [
+                        {'PartNumber': part['part_number'], 'ETag': part['etag']}
+                        for part in sorted(parts or [], key=lambda part: part['part_number'])
+                    ]
+                }
+            )
+        except ClientError:
+            abort_upload_sync(s3, key, upload_id)
+            raise
+
+    size = object_size(s3, key)
+
+    if size is None:
+        raise FileNotFoundError(key)
+
+    if size > UPLOAD_MAX_SIZE:
+        delete_object_sync(s3, key)
+        raise UploadTooLargeError(key)
+
+
+async def initiate_upload(s3: BaseClient, task_id: int, parts: Optional[int] = None) -> Dict[str, Any]:
+    return await run_in_threadpool(initiate_upload_sync, s3, task_id, parts)
+
+
+async def abort_upload(s3: BaseClient, key: str, upload_id: str) -> None:
+    await run_in_threadpool(abort_upload_sync, s3, key, upload_id)
+
+
+async def delete_object(s3: BaseClient, key: str) -> None:
+    await run_in_threadpool(delete_object_sync, s3, key)
+
+
+async def complete_upload(
+        s3: BaseClient,
+        key: str,
+        upload_id: Optional[str] = None,
+        parts: Optional[List[Dict[str, Any]]] = None
+) -> None:
+    await run_in_threadpool(complete_upload_sync, s3, key, upload_id, parts)
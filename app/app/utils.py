@@ -1,22 +1,25 @@
-import numpy as np
-from datetime import datetime, timedelta
-from typing import Any, Union, List
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Union
+from dateutil.parser import parse as parse_datetime
 from jose import jwt
-from fastapi import HTTPException, Request, Depends
+from fastapi import HTTPException, Request
 from jose.exceptions import ExpiredSignatureError, JWTError
-from sqlalchemy.orm import Session
-from csvvalidator import RecordError
 
-from .dependencies import get_db
-from .crud import get_user_by_id
+from .cache import LRUCache
+from .schemas import TokenBlacklist
 from .config import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    ACCESS_TOKEN_CACHE_SIZE,
     JWT_SECRET_KEY,
     ALGORITHM,
     REFRESH_TOKEN_EXPIRE_MINUTES,
     JWT_REFRESH_SECRET_KEY
 )
 
+access_claims_cache = LRUCache(maxsize=ACCESS_TOKEN_CACHE_SIZE)
+
 
 def create_access_token(subject: Union[str, Any], expires_delta: int = None) -> str:
     if expires_delta is not None:
@@ -30,7 +33,8 @@ def create_access_token(subject: Union[str, Any], expires_delta: int = None) ->
         'avatar_url': subject.avatar_url,
         'user_id': subject.id,
         'name': subject.name,
-        'surname': subject.surname
+        'surname': subject.surname,
+        'is_superuser': bool(subject.is_superuser)
     }
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, ALGORITHM)
     return encoded_jwt
@@ -51,20 +55,52 @@ def create_refresh_token(subject: Union[str, Any], expires_delta: int = None) ->
     return encoded_jwt
 
 
-def get_current_user_id_or_403(request: Request) -> int:
-    access_token = request.headers.get('authorization')
+def get_token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
 
-    if not access_token:
-        raise HTTPException(status_code=403, detail='Unauthorized')
+
+def decode_access_token(access_token: str) -> Dict[str, Any]:
+    key = get_token_digest(access_token)
+    claims = access_claims_cache.get(key)
+
+    if claims is None:
+        claims = jwt.decode(access_token, JWT_SECRET_KEY)
+        access_claims_cache.set(key, claims, ttl=claims['exp'] - time.time())
+
+    return claims
+
+
+def get_access_claims(request: Request) -> Optional[Dict[str, Any]]:
+    authorization = request.headers.get('authorization')
+
+    if not authorization:
+        return None
 
     try:
-        claims = jwt.decode(access_token.split()[1], JWT_SECRET_KEY)
-    except (JWTError, ExpiredSignatureError):
+        return decode_access_token(authorization.split()[-1])
+    except (JWTError, ExpiredSignatureError, KeyError):
+        return None
+
+
+async def get_current_user_id_or_403(request: Request) -> int:
+    claims = get_access_claims(request)
+
+    if not claims:
         raise HTTPException(status_code=403, detail='Unauthorized')
 
     return claims.get('user_id')
 
 
+async def get_stream_user_id_or_403(request: Request, access_token: Optional[str] = None) -> int:
+    if access_token is None:
+        return await get_current_user_id_or_403(request)
+
+    try:
+        return decode_access_token(access_token)['user_id']
+    except (JWTError, ExpiredSignatureError, KeyError):
+        raise HTTPException(status_code=403, detail='Unauthorized')
+
+
 def get_refresh_token_or_403(request: Request) -> str:
     refresh_token = request.cookies.get('refresh_token')
 
@@ -79,21 +115,10 @@ def get_refresh_token_or_403(request: Request) -> str:
     return refresh_token
 
 
-def get_superadmin_or_404(request: Request, db: Session = Depends(get_db)) -> bool:
-    access_token = request.headers.get('authorization')
-
-    if not access_token:
-        raise HTTPException(status_code=404, detail='Not Found')
-
-    try:
-        claims = jwt.decode(access_token.split()[1], JWT_SECRET_KEY)
-        user_id = claims.get('user_id')
-    except (JWTError, ExpiredSignatureError):
-        raise HTTPException(status_code=404, detail='Not Found')
-
-    user = get_user_by_id(db=db, user_id=user_id)
+async def get_superadmin_or_404(request: Request) -> bool:
+    claims = get_access_claims(request)
 
-    if user.is_superuser:
+    if claims and claims.get('is_superuser') is True:
         return True
 
     raise HTTPException(status_code=404, detail='Not Found')
@@ -104,111 +129,18 @@ def get_user_id_from_refresh_token(refresh_token: str) -> int:
     return claims.get('user_id')
 
 
-def check_csv_records(record):
-    id = record['id']
-    result = record['result']
-
-    if not id or not result:
-        raise RecordError('EX8', f'Invalid record: {record}')
-
-
-class Metric:
-
-    def __init__(self, y_real: List, y_predicted: List) -> None:
-        self.y_real = np.array(y_real)
-        self.y_predicted = np.array(y_predicted)
-
-    def calc(self) -> float:
-        pass
-
-
-class MSE(Metric):
-
-    def __init__(self, y_real: List, y_predicted: List) -> None:
-        super().__init__(y_real, y_predicted)
-
-    def calc(self) -> float:
-        return 1 / len(self.y_real) * sum((self.y_real - self.y_predicted) ** 2)
-
-
-class MAPE(Metric):
-
-    def __init__(self, y_real: List, y_predicted: List) -> None:
-        super().__init__(y_real, y_predicted)
-
-    def calc(self) -> float:
-        return 1 / len(self.y_real) * sum((self.y_real - self.y_predicted) / self.y_real)
-
-
-class MAE(Metric):
-
-    def __init__(self, y_real: List, y_predicted: List) -> None:
-        super().__init__(y_real, y_predicted)
-
-    def calc(self) -> float:
-        return 1 / len(self.y_real) * sum(abs(self.y_real - self.y_predicted))
-
-
-class Accuracy(Metric):
-
-    def __init__(self, y_real: List, y_predicted: List) -> None:
-        super.__init__(y_real, y_predicted)
-
-    def calc(self) -> float:
-        return np.sum(np.equal(self.y_real, self.y_predicted)) / len(self.y_real)
-
-
-class Precision(Metric):
-
-    def __init__(self, y_real: List, y_predicted: List) -> None:
-        super.__init__(y_real, y_predicted)
-
-    def calc(self) -> float:
-        true_positives = sum(1 for a, p in zip(self.y_real, self.y_predicted) if a == 1 and p == 1)
-        false_positives = sum(1 for a, p in zip(self.y_real, self.y_predicted) if a == 0 and p == 1)
-
-        if true_positives + false_positives == 0:
-            return 0.0
-
-        precision = true_positives / (true_positives + false_positives)
-
-        return precision
-
-
-class Recall(Metric):
-
-    def __init__(self, y_real: List, y_predicted: List) -> None:
-        super().__init__(y_real, y_predicted)
-
-    def calc(self) -> float:
-        true_positives = sum(1 for a, p in zip(self.y_real, self.y_predicted) if a == 1 and p == 1)
-        false_negatives = sum(1 for a, p in zip(self.y_real, self.y_predicted) if a == 1 and p == 0)
-
-        if true_positives + false_negatives == 0:
-            return 0.0
-
-        recall = true_positives / (true_positives + false_negatives)
-
-        return recall
-
-
-class F1Score(Metric):
-
-    def __init__(self, y_real: List, y_predicted: List) -> None:
-        super().__init__(y_real, y_predicted)
-
-    def calc(self) -> float:
-        true_positives = sum(1 for a, p in zip(self.y_real, self.y_predicted) if a == 1 and p == 1)
-        false_positives = sum(1 for a, p in zip(self.y_real, self.y_predicted) if a == 0 and p == 1)
-        false_negatives = sum(1 for a, p in zip(self.y_real, self.y_predicted) if a == 1 and p == 0)
-
-        if true_positives + false_positives == 0 or true_positives + false_negatives == 0:
-            return 0.0
+def get_revoked_token(refresh_token: str) -> TokenBlacklist:
+    claims = jwt.decode(refresh_token, JWT_REFRESH_SECRET_KEY)
+    return TokenBlacklist(
+        token_digest=get_token_digest(refresh_token),
+        expires_at=datetime.utcfromtimestamp(claims['exp'])
+    )
 
-        precision = true_positives / (true_positives + false_positives)
 
-        recall = true_positives / (true_positives + false_negatives)
+def parse_date(value: str) -> datetime:
+    parsed = parse_datetime(value)
 
-        f1_score = 2 * (precision * recall) / (precision + recall)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
 
-        return f1_score
+    return parsed
@@ -0,0 +1,217 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, engine
+from .metrics import calculate_metric, get_metric
+from .scoring import (
+    get_ground_truth,
+    get_cached_ground_truth,
+    load_ground_truth,
+    unpack_answers,
+    align_answers,
+    score_answers
+)
+from .crud import (
+    claim_score_jobs_in_db,
+    finish_score_job_in_db,
+    claim_rescore_job_in_db,
+    finish_rescore_job_in_db,
+    get_rescore_job_from_db,
+    get_active_answer_ids_in_db,
+    get_active_answers_in_db,
+    save_rescored_answers_in_db,
+    rebuild_leaderboard_in_db,
+    get_answer_from_db,
+    get_task_from_db,
+    get_task_answer_from_db,
+    purge_expired_tokens_in_db,
+    update_score_in_db
+)
+from .config import (
+    SCORING_PROCESSES,
+    SCORING_BATCH_SIZE,
+    SCORING_POLL_INTERVAL,
+    SCORING_JOB_TIMEOUT,
+    SCORING_MAX_ATTEMPTS,
+    RESCORING_BATCH_SIZE,
+    RESCORING_MAX_PENDING_BATCHES,
+    TOKEN_BLACKLIST_PURGE_INTERVAL
+)
+
+logger = logging.getLogger(__name__)
+
+
+def init_scoring_process() -> None:
+    engine.dispose(close=False)
+
+
+def score_answer(answer_id: int) -> Tuple[float, float]:
+    with SessionLocal() as db:
+        answer = get_answer_from_db(db=db, answer_id=answer_id)
+
+        if answer is None:
+            raise ValueError('Answer not found')
+
+        task = get_task_from_db(db=db, task_id=answer.task_id)
+        ground_truth = get_ground_truth(task)
+        ids, values = unpack_answers(answer.task_ans)
+        metric = get_metric(task.function.name)
+
+    score = calculate_metric(metric.name, ground_truth.values, align_answers(ground_truth, ids=ids, values=values))
+    return score, metric.rank_score(score)
+
+
+def process_score_jobs(db: Session, executor: ProcessPoolExecutor) -> int:
+    jobs = claim_score_jobs_in_db(
+        db=db,
+        limit=SCORING_BATCH_SIZE,
+        timeout=SCORING_JOB_TIMEOUT,
+        max_attempts=SCORING_MAX_ATTEMPTS
+    )
+    futures = {job_id: (answer_id, executor.submit(score_answer, answer_id)) for job_id, answer_id in jobs}
+
+    for job_id, (answer_id, future) in futures.items():
+        try:
+            score, rank_score = future.result()
+            update_score_in_db(db=db, answer_id=answer_id, score=score, rank_score=rank_score)
+        except ValueError as e:
+            db.rollback()
+            logger.warning('Score job %s cannot be scored: %s', job_id, e)
+            finish_score_job_in_db(db=db, job_id=job_id, max_attempts=SCORING_MAX_ATTEMPTS, error=repr(e), retry=False)
+        except Exception as e:
+            db.rollback()
+            logger.exception('Score job %s failed', job_id)
+            finish_score_job_in_db(db=db, job_id=job_id, max_attempts=SCORING_MAX_ATTEMPTS, error=repr(e))
+        else:
+            finish_score_job_in_db(db=db, job_id=job_id, max_attempts=SCORING_MAX_ATTEMPTS)
+
+    return len(jobs)
+
+
+def rescore_batch(
+        metric_name: str,
+        task_id: int,
+        ans_version: int,
+        first_id: int,
+        last_id: int
+) -> List[Tuple[int, Optional[float]]]:
+    with SessionLocal() as db:
+        ground_truth = get_cached_ground_truth(task_id, ans_version)
+
+        if ground_truth is None:
+            task_answer = get_task_answer_from_db(db=db, task_id=task_id)
+
+            if not task_answer:
+                raise ValueError('Task answer is not uploaded')
+
+            ground_truth = load_ground_truth(task_id, task_answer.ans_version, task_answer.task_ans)
+
+        answers = get_active_answers_in_db(db=db, task_id=task_id, first_id=first_id, last_id=last_id)
+
+    return score_answers(metric_name, ground_truth, answers)
+
+
+def rescore_step(db: Session, executor: ProcessPoolExecutor, job_id: int, task_id: int) -> bool:
+    job = get_rescore_job_from_db(db=db, job_id=job_id)
+    task = get_task_from_db(db=db, task_id=task_id)
+    metric = get_metric(task.function.name)
+    limit = RESCORING_BATCH_SIZE * RESCORING_MAX_PENDING_BATCHES
+
+    answer_ids = get_active_answer_ids_in_db(db=db, task_id=task_id, limit=limit, after=job.last_answer_id)
+    batches = [answer_ids[start:start + RESCORING_BATCH_SIZE] for start in range(0, len(answer_ids), RESCORING_BATCH_SIZE)]
+    futures = [
+        executor.submit(rescore_batch, metric.name, task_id, task.ans_version, batch[0], batch[-1])
+        for batch in batches
+    ]
+
+    for batch, future in zip(batches, futures):
+        save_rescored_answers_in_db(db=db, job_id=job_id, scores=future.result(), last_answer_id=batch[-1])
+
+    if answer_ids:
+        logger.info('Rescore job %s: task %s rescored up to answer %s', job_id, task_id, answer_ids[-1])
+
+    if len(answer_ids) < limit:
+        rebuild_leaderboard_in_db(db=db, task_id=task_id, greater_is_better=metric.greater_is_better)
+        return True
+
+    return False
+
+
+def process_rescore_job(
+        db: Session,
+        executor: ProcessPoolExecutor,
+        job: Optional[Tuple[int, int]] = None
+) -> Optional[Tuple[int, int]]:
+    if job is None:
+        job = claim_rescore_job_in_db(db=db, timeout=SCORING_JOB_TIMEOUT, max_attempts=SCORING_MAX_ATTEMPTS)
+
+    if job is None:
+        return None
+
+    job_id, task_id = job
+
+    try:
+        finished = rescore_step(db=db, executor=executor, job_id=job_id, task_id=task_id)
+    except ValueError as e:
+        db.rollback()
+        logger.warning('Rescore job %s cannot be processed: %s', job_id, e)
+        finish_rescore_job_in_db(db=db, job_id=job_id, max_attempts=SCORING_MAX_ATTEMPTS, error=repr(e), retry=False)
+    except Exception as e:
+        db.rollback()
+        logger.exception('Rescore job %s failed', job_id)
+        finish_rescore_job_in_db(db=db, job_id=job_id, max_attempts=SCORING_MAX_ATTEMPTS, error=repr(e))
+    else:
+        if not finished:
+            return job
+
+        finish_rescore_job_in_db(db=db, job_id=job_id, max_attempts=SCORING_MAX_ATTEMPTS)
+
+    return None
+
+
+def purge_expired_tokens(db: Session) -> None:
+    purged = purge_expired_tokens_in_db(db=db)
+
+    if purged:
+        logger.info('Purged %s expired blacklisted tokens', purged)
+
+
+def run() -> None:
+    logger.info('Scoring worker started with %s processes', SCORING_PROCESSES)
+    purged_at = None
+    rescoring = None
+
+    with ProcessPoolExecutor(max_workers=SCORING_PROCESSES, initializer=init_scoring_process) as executor:
+        while True:
+            db = SessionLocal()
+
+            try:
+                if purged_at is None or time.monotonic() - purged_at >= TOKEN_BLACKLIST_PURGE_INTERVAL:
+                    purged_at = time.monotonic()
+                    purge_expired_tokens(db=db)
+
+                processed = process_score_jobs(db=db, executor=executor)
+                rescoring = process_rescore_job(db=db, executor=executor, job=rescoring)
+            except Exception:
+                db.rollback()
+                logger.exception('Cannot process score jobs')
+                processed = 0
+                rescoring = None
+            finally:
+                db.close()
+
+            if not processed and rescoring is None:
+                time.sleep(SCORING_POLL_INTERVAL)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        run()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,97 @@
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List
+
+from benchmarks import answer_indexes, csv_parsing, metrics, serialization
+
+Results = Dict[str, Dict[str, float]]
+
+SUITES: Dict[str, Callable[[argparse.Namespace], Results]] = {
+    'metrics': lambda args: metrics.run(rows=args.rows, repeat=args.repeat),
+    'csv': lambda args: csv_parsing.run(rows=args.rows, repeat=args.repeat),
+    'serialization': lambda args: serialization.run(tasks=args.tasks, repeat=args.repeat),
+    'queries': lambda args: answer_indexes.measure_queries(rows=args.answers, repeat=args.repeat)
+}
+
+
+def run_suites(names: Iterable[str], args: argparse.Namespace) -> Dict[str, Any]:
+    results: Results = {}
+
+    for name in names:
+        print(f'running {name}', file=sys.stderr)
+        results.update(SUITES[name](args))
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'params': {'rows': args.rows, 'answers': args.answers, 'tasks': args.tasks, 'repeat': args.repeat},
+        'results': results
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+
+    for name, timing in sorted(report['results'].items()):
+        previous = baseline['results'].get(name)
+
+        if previous is None:
+            print(f'{name:36} {timing["median"] * 1000:10.3f}ms  (new)')
+            continue
+
+        ratio = timing['median'] / previous['median']
+        regressed = ratio > 1 + tolerance
+
+        if regressed:
+            regressions.append(name)
+
+        print(
+            f'{name:36} {timing["median"] * 1000:10.3f}ms  baseline {previous["median"] * 1000:10.3f}ms  '
+            f'{ratio:6.2f}x{"  REGRESSION" if regressed else ""}'
+        )
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run benchmark suites and compare them against a stored baseline.')
+    parser.add_argument('--suite', action='append', choices=SUITES, help='suite to run, repeatable (default: all)')
+    parser.add_argument('--rows', type=int, default=100_000, help='answer rows for metric and CSV suites')
+    parser.add_argument('--answers', type=int, default=100_000, help='seeded answer rows for the query suite')
+    parser.add_argument('--tasks', type=int, default=100, help='tasks per rendered listing')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown of the median before failing')
+    args = parser.parse_args()
+
+    report = run_suites(args.suite or SUITES, args)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if not args.baseline:
+        for name, timing in sorted(report['results'].items()):
+            print(f'{name:36} {timing["median"] * 1000:10.3f}ms')
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    if baseline.get('params') != report['params']:
+        print(f'baseline was recorded with {baseline.get("params")}, timings may not be comparable', file=sys.stderr)
+
+    regressions = compare(report, baseline, args.tolerance)
+
+    if regressions:
+        print(f'{len(regressions)} regression(s) over {args.tolerance:.0%}: {", ".join(regressions)}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
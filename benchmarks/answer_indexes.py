@@ -0,0 +1,169 @@
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.app import crud
+from app.app.database import engine
+from benchmarks.timing import measure_call
+
+SEED_SQL = (
+    "INSERT INTO function (id, name) VALUES (-1, 'MSE')",
+    (
+        'INSERT INTO "user" (id, provider_id, name, surname, avatar_url, email, is_active, is_superuser) '
+        "SELECT -g, 'bench-' || g, 'User', g::text, '', 'bench' || g || '@example.com', TRUE, FALSE "
+        'FROM generate_series(1, :users) g'
+    ),
+    (
+        'INSERT INTO task (id, name, short_description, description, start_date, end_date, '
+        'function_id, ans_type, tags, is_active) '
+        "SELECT -g, 'Benchmark ' || g, '', '', now(), now() + interval '30 days', -1, 'float', "
+        "ARRAY['bench'], TRUE FROM generate_series(1, :tasks) g"
+    ),
+    (
+        'INSERT INTO answer (task_id, user_id, score, added_at, is_active) '
+        'SELECT -(1 + g % :tasks), -(1 + (g::bigint * 7919) % :users), '
+        'CASE WHEN g % 10 = 0 THEN NULL ELSE random() END, '
+        "now() - g * interval '1 second', g % 20 <> 0 "
+        'FROM generate_series(1, :answers) g'
+    ),
+    (
+        'INSERT INTO leaderboard (task_id, user_id, answer_id, score, rank_score, updated_at) '
+        'SELECT DISTINCT ON (task_id, user_id) task_id, user_id, id, score, -score, now() FROM answer '
+        'WHERE task_id < 0 AND score IS NOT NULL AND is_active IS TRUE '
+        'ORDER BY task_id, user_id, score, id'
+    ),
+    'ANALYZE function, "user", task, answer, leaderboard'
+)
+
+
+class Case(NamedTuple):
+
+    name: str
+    index: str
+    call: Callable[[Session], Any]
+
+
+CASES = (
+    Case(
+        name='user_answers_for_task',
+        index='ix_answer_task_user_scored',
+        call=lambda db: crud.get_user_answers_for_task_in_db(db=db, task_id=-1, user_id=-1, limit=50)
+    ),
+    Case(
+        name='tasks_for_participant',
+        index='ix_answer_user_task_added_at',
+        call=lambda db: crud.get_all_tasks_for_user_id_db(db=db, user_id=-1)
+    ),
+    Case(
+        name='scoreboard',
+        index='ix_leaderboard_task_rank',
+        call=lambda db: crud.get_all_answers_for_task_in_db(db=db, task_id=-1, limit=100)
+    ),
+    Case(
+        name='rescore_batch_ids',
+        index='ix_answer_task_active',
+        call=lambda db: crud.get_active_answer_ids_in_db(db=db, task_id=-1, limit=500, after=0)
+    ),
+)
+
+
+def seed(connection: Connection, answers: int, users: int, tasks: int) -> None:
+    for sql in SEED_SQL:
+        connection.execute(text(sql), {'answers': answers, 'users': users, 'tasks': tasks})
+
+
+def iter_plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+
+    for child in plan.get('Plans', ()):
+        yield from iter_plan_nodes(child)
+
+
+def explain(connection: Connection, db: Session, case: Case) -> List[Dict[str, Any]]:
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(connection, 'before_cursor_execute', capture)
+
+    try:
+        case.call(db)
+    finally:
+        event.remove(connection, 'before_cursor_execute', capture)
+
+    statement, parameters = captured[-1]
+    plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return list(iter_plan_nodes(plan[0]['Plan']))
+
+
+@contextmanager
+def seeded(answers: int, users: int, tasks: int) -> Iterator[Tuple[Connection, Session]]:
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = Session(bind=connection)
+
+        try:
+            started_at = time.perf_counter()
+            seed(connection, answers=answers, users=users, tasks=tasks)
+            print(f'seeded {answers} answers in {time.perf_counter() - started_at:.1f}s', file=sys.stderr)
+            yield connection, db
+        finally:
+            db.close()
+            transaction.rollback()
+
+
+def check_indexes(connection: Connection, db: Session, case: Case) -> Tuple[bool, List[str]]:
+    nodes = explain(connection, db, case)
+    indexes = sorted({node['Index Name'] for node in nodes if 'Index Name' in node})
+    seq_scans = [node for node in nodes if node['Node Type'] == 'Seq Scan' and node['Relation Name'] == 'answer']
+    return case.index in indexes and not seq_scans, indexes
+
+
+def measure_queries(rows: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    with seeded(answers=rows, users=max(rows // 100, 1), tasks=50) as (_, db):
+        return {f'queries.{case.name}': measure_call(lambda: case.call(db), repeat) for case in CASES}
+
+
+def run(answers: int, users: int, tasks: int, repeat: int) -> bool:
+    passed = True
+
+    with seeded(answers=answers, users=users, tasks=tasks) as (connection, db):
+        for case in CASES:
+            ok, indexes = check_indexes(connection, db, case)
+            passed = passed and ok
+            timing = measure_call(lambda: case.call(db), repeat)
+
+            print(
+                f"{'ok' if ok else 'FAIL':4} {case.name:24} median {timing['median'] * 1000:8.2f}ms "
+                f"indexes: {', '.join(indexes) or '-'}"
+            )
+
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Seed answers and check that hot queries use the answer indexes.')
+    parser.add_argument('--answers', type=int, default=2_000_000)
+    parser.add_argument('--users', type=int, default=20_000)
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if not run(answers=args.answers, users=args.users, tasks=args.tasks, repeat=args.repeat):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
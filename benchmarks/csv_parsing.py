@@ -0,0 +1,39 @@
+import argparse
+import io
+from typing import Dict
+
+import numpy as np
+
+from app.app.csv_stream import read_answers_csv, iter_answers_csv
+from benchmarks.timing import measure_call
+
+
+def make_csv(rows: int, seed: int = 0) -> bytes:
+    generator = np.random.default_rng(seed)
+    ids = generator.permutation(rows) + 1
+    values = generator.uniform(0, 100, rows)
+    return b'id,result\n' + ''.join(f'{id},{result!r}\n' for id, result in zip(ids.tolist(), values.tolist())).encode()
+
+
+def run(rows: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    data = make_csv(rows)
+    ids, values = read_answers_csv(io.BytesIO(data))
+
+    return {
+        'csv.read_answers': measure_call(lambda: read_answers_csv(io.BytesIO(data)), repeat),
+        'csv.write_answers': measure_call(lambda: b''.join(iter_answers_csv(ids, values)), repeat)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measure parsing and rendering of answer CSV files.')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    for name, timing in run(rows=args.rows, repeat=args.repeat).items():
+        print(f"{name:28} median {timing['median'] * 1000:8.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import argparse
+from typing import Dict
+
+import numpy as np
+
+from app.app.metrics import METRICS, calculate_metric
+from app.app.scoring import GroundTruth, pack_answers, score_answers
+from benchmarks.timing import measure_call
+
+
+def make_answers(rows: int, metric_name: str, seed: int = 0):
+    generator = np.random.default_rng(seed)
+
+    if METRICS[metric_name].uses_confusion_matrix:
+        return generator.integers(0, 2, rows).astype(np.float64), generator.integers(0, 2, rows).astype(np.float64)
+
+    y_real = generator.uniform(1, 100, rows)
+    return y_real, y_real + generator.normal(0, 1, rows)
+
+
+def run(rows: int, repeat: int, submissions: int = 100) -> Dict[str, Dict[str, float]]:
+    results = {}
+
+    for name in METRICS:
+        y_real, y_predicted = make_answers(rows, name)
+        results[f'metrics.{name}'] = measure_call(lambda: calculate_metric(name, y_real, y_predicted), repeat)
+
+    ids = np.arange(1, rows + 1, dtype=np.int64)
+    y_real, y_predicted = make_answers(rows, 'MSE')
+    ground_truth = GroundTruth(version=1, ids=ids, values=y_real)
+    answers = [(answer_id, pack_answers(ids, y_predicted)) for answer_id in range(submissions)]
+    results['scoring.score_answers'] = measure_call(lambda: score_answers('MSE', ground_truth, answers), repeat)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measure metric calculation and batch rescoring.')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for name, timing in run(rows=args.rows, repeat=args.repeat).items():
+        print(f"{name:28} median {timing['median'] * 1000:8.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.app.models import Task
+from app.app.schemas import ReturnTask
+from app.app.serialization import Projection
+from benchmarks.timing import measure_call
+
+task_list_adapter = TypeAdapter(List[ReturnTask])
+task_projection = Projection(ReturnTask)
+
+
+def make_tasks(count: int) -> List[Task]:
+    started_at = datetime(2024, 1, 1)
+
+    return [
+        Task(
+            id=task_id,
+            name=f'Task {task_id}',
+            short_description='Short description of the task',
+            description='A longer description of the task. ' * 10,
+            start_date=started_at,
+            end_date=started_at + timedelta(days=task_id),
+            function_id=1,
+            task_data=f'https://storage.example.com/datasets/{task_id}?signature=abcdef',
+            test_data=f'https://storage.example.com/datasets/test-{task_id}?signature=abcdef',
+            ans_type='float',
+            tags=['ml', 'regression', f'tag-{task_id % 10}'],
+            is_active=task_id % 2 == 0
+        )
+        for task_id in range(1, count + 1)
+    ]
+
+
+def response_model_render(tasks: List[Task]) -> bytes:
+    validated = task_list_adapter.validate_python(tasks, from_attributes=True)
+    content = task_list_adapter.dump_python(validated, mode='json')
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')).encode('utf-8')
+
+
+def projection_render(tasks: List[Task]) -> bytes:
+    return orjson.dumps(task_projection.rows(tasks))
+
+
+def run(tasks: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    tasks = make_tasks(tasks)
+
+    return {
+        'serialization.response_model': measure_call(lambda: response_model_render(tasks), repeat),
+        'serialization.projection': measure_call(lambda: projection_render(tasks), repeat)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare the time of rendering a task listing.')
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+
+    if orjson.loads(response_model_render(tasks)) != orjson.loads(projection_render(tasks)):
+        raise SystemExit('Projection output differs from response_model output')
+
+    timings = run(args.tasks, args.repeat)
+    baseline = timings['serialization.response_model']['median']
+    projected = timings['serialization.projection']['median']
+
+    print(f'response_model + json  {baseline * 1000:8.3f}ms median per {args.tasks}-task response')
+    print(f'projection + orjson    {projected * 1000:8.3f}ms median per {args.tasks}-task response')
+    print(f'speedup                {baseline / projected:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
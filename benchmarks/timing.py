@@ -0,0 +1,19 @@
+import statistics
+import time
+from typing import Any, Callable, Dict
+
+
+def measure_call(call: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    call()
+    timings = []
+
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started_at)
+
+    return {
+        'median': statistics.median(timings),
+        'min': min(timings),
+        'max': max(timings)
+    }
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import os
+import sys
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List
+
+import httpx
+import orjson
+import uvicorn
+
+from loadtest.replay import load_records, make_client, replay, format_report
+
+
+def promote_superusers(provider_ids: List[str]) -> None:
+    from app.app import models
+    from app.app.database import SessionLocal
+
+    with SessionLocal() as db:
+        db.query(models.User).filter(
+            models.User.provider_id.in_(provider_ids)
+        ).update({'is_superuser': True}, synchronize_session=False)
+        db.commit()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    records = load_records(args.file)
+    superusers = set(args.superuser or ())
+    promote = (lambda users: promote_superusers([user for user in users if user in superusers])) if superusers else None
+
+    async with AsyncExitStack() as stack:
+        if args.base_url:
+            transport, base_url = None, args.base_url
+        else:
+            from app.app.main import app
+            from loadtest.stubs import install_stubs
+
+            install_stubs(app, s3_latency=args.s3_latency)
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport, base_url = httpx.ASGITransport(app=app), 'http://loadtest'
+
+        client = await stack.enter_async_context(make_client(transport, base_url, args.timeout, args.concurrency))
+        return await replay(
+            client,
+            records,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            duration=args.duration,
+            promote=promote
+        )
+
+
+def serve(args: argparse.Namespace) -> None:
+    os.environ['LOADTEST_S3_LATENCY'] = str(args.s3_latency)
+    uvicorn.run('loadtest.server:app', host=args.host, port=args.port, workers=args.workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replay recorded requests against the API and report latency per route.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='replay a JSONL file of recorded requests')
+    run_parser.add_argument('file')
+    run_parser.add_argument('--base-url', help='target a running server instead of the in-process app')
+    run_parser.add_argument('--concurrency', type=int, default=16)
+    run_parser.add_argument('--requests', type=int, help='number of requests to send, cycling through the file')
+    run_parser.add_argument('--duration', type=float, help='stop after this many seconds')
+    run_parser.add_argument('--timeout', type=float, default=30.0)
+    run_parser.add_argument('--superuser', action='append', help='recorded user to promote to superuser, repeatable')
+    run_parser.add_argument('--s3-latency', type=float, default=0.0, help='seconds added to every fake S3 call')
+    run_parser.add_argument('--output', help='write the JSON report to this file')
+    run_parser.add_argument('--max-error-rate', type=float, help='fail when the overall error rate is higher')
+
+    serve_parser = commands.add_parser('serve', help='serve the API with fake S3 and stubbed Google SSO')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--workers', type=int, default=1)
+    serve_parser.add_argument('--s3-latency', type=float, default=0.0, help='seconds added to every fake S3 call')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args)
+        return
+
+    if not args.requests and not args.duration:
+        args.requests = len(load_records(args.file))
+
+    report = asyncio.run(run(args))
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, 'wb') as file:
+            file.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+
+    if args.max_error_rate is not None and report['total']['error_rate'] > args.max_error_rate:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import asyncio
+import itertools
+import re
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import httpx
+import numpy as np
+import orjson
+
+NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+class Recorded(NamedTuple):
+
+    route: str
+    method: str
+    path: str
+    params: Optional[Dict[str, Any]]
+    json: Any
+    data: Optional[Dict[str, Any]]
+    files: Optional[Dict[str, Any]]
+    headers: Dict[str, str]
+    user: Optional[str]
+    status: Optional[int]
+
+
+class Sample(NamedTuple):
+
+    route: str
+    latency: float
+    status: Optional[int]
+    error: bool
+
+
+def route_name(method: str, path: str) -> str:
+    return f'{method} {NUMERIC_SEGMENT.sub("/{id}", path)}'
+
+
+def parse_record(line: str) -> Recorded:
+    record = orjson.loads(line)
+    method = record.get('method', 'GET').upper()
+    files = record.get('files')
+
+    if files:
+        files = {
+            field: (file['filename'], file['content'].encode(), file.get('content_type', 'text/csv'))
+            for field, file in files.items()
+        }
+
+    return Recorded(
+        route=record.get('name') or route_name(method, record['path']),
+        method=method,
+        path=record['path'],
+        params=record.get('params'),
+        json=record.get('json'),
+        data=record.get('data'),
+        files=files,
+        headers=record.get('headers', {}),
+        user=record.get('user'),
+        status=record.get('status')
+    )
+
+
+def load_records(path: str) -> List[Recorded]:
+    with open(path) as file:
+        records = [parse_record(line) for line in file if line.strip() and not line.lstrip().startswith('#')]
+
+    if not records:
+        raise ValueError(f'{path} has no requests')
+
+    return records
+
+
+class Session:
+
+    def __init__(self, access_token: str, refresh_token: Optional[str]) -> None:
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+
+    def headers(self) -> Dict[str, str]:
+        headers = {'authorization': f'Bearer {self.access_token}'}
+
+        if self.refresh_token:
+            headers['cookie'] = f'refresh_token={self.refresh_token}'
+
+        return headers
+
+    def update(self, response: httpx.Response) -> None:
+        refresh_token = response.cookies.get('refresh_token')
+
+        if refresh_token:
+            self.refresh_token = refresh_token
+
+            if response.headers.get('content-type', '').startswith('application/json'):
+                self.access_token = response.json().get('access_token', self.access_token)
+
+
+def make_client(transport: Optional[httpx.AsyncBaseTransport], base_url: str, timeout: float, concurrency: int) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=transport,
+        base_url=base_url,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+    )
+
+
+async def login(client: httpx.AsyncClient, user: str) -> Session:
+    response = await client.get('/auth/google/callback', params={'code': user})
+    response.raise_for_status()
+    return Session(access_token=response.json()['access_token'], refresh_token=response.cookies.get('refresh_token'))
+
+
+async def login_users(
+        client: httpx.AsyncClient,
+        records: List[Recorded],
+        promote: Optional[Callable[[List[str]], None]] = None
+) -> Dict[str, Session]:
+    users = sorted({record.user for record in records if record.user})
+    sessions = await asyncio.gather(*(login(client, user) for user in users))
+
+    if promote:
+        # the superuser claim is issued at login, so promoted users sign in again
+        await asyncio.to_thread(promote, users)
+        sessions = await asyncio.gather(*(login(client, user) for user in users))
+
+    return dict(zip(users, sessions))
+
+
+async def send(client: httpx.AsyncClient, record: Recorded, sessions: Dict[str, Session]) -> Sample:
+    session = sessions.get(record.user)
+    headers = {**record.headers, **session.headers()} if session else record.headers
+    started_at = time.perf_counter()
+
+    try:
+        response = await client.request(
+            record.method,
+            record.path,
+            params=record.params,
+            json=record.json,
+            data=record.data,
+            files=record.files,
+            headers=headers
+        )
+        await response.aread()
+    except httpx.HTTPError:
+        return Sample(route=record.route, latency=time.perf_counter() - started_at, status=None, error=True)
+
+    latency = time.perf_counter() - started_at
+
+    if session:
+        session.update(response)
+
+    error = response.status_code != record.status if record.status else response.status_code >= 400
+    return Sample(route=record.route, latency=latency, status=response.status_code, error=error)
+
+
+async def replay(
+        client: httpx.AsyncClient,
+        records: List[Recorded],
+        concurrency: int,
+        requests: Optional[int] = None,
+        duration: Optional[float] = None,
+        promote: Optional[Callable[[List[str]], None]] = None
+) -> Dict[str, Any]:
+    sessions = await login_users(client, records, promote)
+    queue: Iterator[Recorded] = itertools.cycle(records)
+
+    if requests:
+        queue = itertools.islice(queue, requests)
+
+    samples: List[Sample] = []
+    started_at = time.perf_counter()
+    deadline = started_at + duration if duration else None
+
+    async def worker() -> None:
+        for record in queue:
+            samples.append(await send(client, record, sessions))
+
+            if deadline and time.perf_counter() >= deadline:
+                return
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started_at, concurrency)
+
+
+def summarize_route(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    latencies = np.array([sample.latency for sample in samples])
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99))
+    errors = sum(sample.error for sample in samples)
+    statuses: Dict[str, int] = {}
+
+    for sample in samples:
+        status = str(sample.status or 'failed')
+        statuses[status] = statuses.get(status, 0) + 1
+
+    return {
+        'requests': len(samples),
+        'throughput': len(samples) / elapsed,
+        'error_rate': errors / len(samples),
+        'mean': float(latencies.mean()),
+        'p50': float(p50),
+        'p95': float(p95),
+        'p99': float(p99),
+        'max': float(latencies.max()),
+        'statuses': statuses
+    }
+
+
+def summarize(samples: List[Sample], elapsed: float, concurrency: int) -> Dict[str, Any]:
+    routes: Dict[str, List[Sample]] = {}
+
+    for sample in samples:
+        routes.setdefault(sample.route, []).append(sample)
+
+    return {
+        'concurrency': concurrency,
+        'elapsed': elapsed,
+        'total': summarize_route(samples, elapsed),
+        'routes': {route: summarize_route(route_samples, elapsed) for route, route_samples in sorted(routes.items())}
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['total']['requests']} requests in {report['elapsed']:.1f}s at concurrency {report['concurrency']}",
+        f"{'route':48} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+
+    for route, stats in (*report['routes'].items(), ('total', report['total'])):
+        lines.append(
+            f"{route:48} {stats['requests']:7} {stats['throughput']:8.1f} {stats['error_rate'] * 100:6.2f} "
+            f"{stats['p50'] * 1000:8.2f} {stats['p95'] * 1000:8.2f} {stats['p99'] * 1000:8.2f}"
+        )
+
+    return '\n'.join(lines)
@@ -0,0 +1,6 @@
+import os
+
+from app.app.main import app
+from loadtest.stubs import install_stubs
+
+install_stubs(app, s3_latency=float(os.environ.get('LOADTEST_S3_LATENCY', 0)))
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict
+
+from botocore.exceptions import ClientError
+from fastapi import FastAPI
+from fastapi_sso.sso.base import OpenID
+from starlette.requests import Request
+
+from app.app.dependencies import get_s3
+from app.app.routers import auth
+
+FAKE_S3_URL = 'http://s3.loadtest.local'
+
+
+class FakeS3:
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.objects: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _call(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self.objects[key] = data
+
+    def generate_presigned_url(self, ClientMethod: str, Params: Dict[str, Any], ExpiresIn: int) -> str:
+        query = '&'.join(f'{name}={value}' for name, value in Params.items() if name not in ('Bucket', 'Key'))
+        return f"{FAKE_S3_URL}/{Params['Bucket']}/{Params['Key']}?X-Method={ClientMethod}&X-Expires={ExpiresIn}&{query}"
+
+    def generate_presigned_post(self, Bucket: str, Key: str, **kwargs: Any) -> Dict[str, Any]:
+        # replayed clients never talk to storage, so the direct upload is treated as done
+        self._put(Key, b'')
+        return {'url': f'{FAKE_S3_URL}/{Bucket}', 'fields': {'key': Key}}
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._call()
+
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+
+        return {'ContentLength': len(self.objects[Key])}
+
+    def upload_fileobj(self, Fileobj: BinaryIO, Bucket: str, Key: str, **kwargs: Any) -> None:
+        self._call()
+        self._put(Key, Fileobj.read())
+
+    def create_multipart_upload(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._call()
+        return {'UploadId': uuid.uuid4().hex}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict[str, Any]) -> Dict[str, Any]:
+        self._call()
+        self._put(Key, b'')
+        return {'ETag': hashlib.md5(UploadId.encode()).hexdigest()}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str) -> Dict[str, Any]:
+        self._call()
+        return {}
+
+    def delete_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._call()
+
+        with self._lock:
+            self.objects.pop(Key, None)
+
+        return {}
+
+
+async def verify_google_user(request: Request) -> OpenID:
+    provider_id = request.query_params.get('code', 'loadtest')
+
+    return OpenID(
+        id=provider_id,
+        email=f'{provider_id}@loadtest.example.com',
+        first_name=provider_id,
+        last_name='Loadtest',
+        picture='',
+        provider='google'
+    )
+
+
+def install_stubs(app: FastAPI, s3_latency: float = 0.0) -> FakeS3:
+    s3 = FakeS3(latency=s3_latency)
+    app.dependency_overrides[get_s3] = lambda: s3
+    auth.sso.verify_and_process = verify_google_user
+    return s3